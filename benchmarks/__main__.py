@@ -0,0 +1,43 @@
+import argparse
+import sys
+
+from . import bench_db, bench_decorators, bench_fields, bench_import, bench_language, fixtures, harness
+
+
+def all_benchmarks(rows):
+    return (
+        bench_fields.benchmarks(harness.Benchmark)
+        + bench_language.benchmarks(harness.Benchmark)
+        + bench_db.benchmarks(harness.Benchmark, rows)
+        + bench_decorators.benchmarks(harness.Benchmark, rows)
+        + bench_import.benchmarks(harness.Benchmark)
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Run the flask_validators benchmarks.')
+    parser.add_argument('-k', '--filter', help='only run benchmarks whose name contains this string')
+    parser.add_argument('--min-time', type=float, default=0.5, help='seconds to spend timing each benchmark')
+    parser.add_argument('--rows', type=int, default=fixtures.DEFAULT_ROWS, help='rows in the benchmark database')
+    parser.add_argument('--save', metavar='NAME', help='store the results as baselines/NAME.json (or a .json path)')
+    parser.add_argument('--compare', metavar='BASELINE', help='compare against a saved baseline name or path')
+    parser.add_argument('--threshold', type=float, default=harness.REGRESSION_THRESHOLD,
+                        help='relative p50 slowdown reported as a regression')
+    args = parser.parse_args(argv)
+
+    results = harness.run(all_benchmarks(args.rows), min_time=args.min_time, name_filter=args.filter)
+
+    if args.save:
+        print(f'\nSaved baseline to {harness.save(results, args.save)}')
+
+    if args.compare:
+        print()
+        regressions = harness.compare(results, harness.load(args.compare), threshold=args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) over {args.threshold:.0%}')
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
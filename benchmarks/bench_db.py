@@ -0,0 +1,34 @@
+from flask_validators.models.validate_db import check_column, check_unique, check_existence, run_query_checks
+
+from . import fixtures
+
+
+def _check(check, field, value, rows):
+    def setup():
+        _, Session = fixtures.database(rows)
+        session = Session()
+        return lambda: check(fixtures.User, session, value, {'field': field})
+    return setup
+
+
+def _batched(rows):
+    def setup():
+        _, Session = fixtures.database(rows)
+        session = Session()
+        checks = [
+            ('check_unique', 'new@example.com', {'field': 'email'}),
+            ('check_unique', 'newuser', {'field': 'username'}),
+            ('check_existence', rows // 2, {'field': 'id'}),
+        ]
+        return lambda: run_query_checks(fixtures.User, session, checks)
+    return setup
+
+
+def benchmarks(Benchmark, rows=fixtures.DEFAULT_ROWS):
+    return [
+        Benchmark(f'check_unique[hit,rows={rows}]', _check(check_unique, 'email', f'user{rows // 2}@example.com', rows)),
+        Benchmark(f'check_unique[miss,rows={rows}]', _check(check_unique, 'email', 'new@example.com', rows)),
+        Benchmark(f'check_existence[rows={rows}]', _check(check_existence, 'id', rows // 2, rows)),
+        Benchmark('check_column[email]', _check(check_column, 'email', 'new@example.com', rows)),
+        Benchmark(f'run_query_checks[3 checks,rows={rows}]', _batched(rows)),
+    ]
@@ -0,0 +1,52 @@
+import io
+
+from . import fixtures
+
+FORM = {
+    'email': 'jane.doe@example.com',
+    'name': 'Jane Doe',
+    'age': '42',
+    'password': 's3cret!pass',
+    'confirm_password': 's3cret!pass',
+}
+
+
+def _post(path, rows, **payload):
+    def setup():
+        client = fixtures.app(rows).test_client()
+        return lambda: client.post(path, **payload)
+    return setup
+
+
+# A PNG header padded to the upload size; the oversized one is rejected
+# while it streams.
+PNG_HEADER = b'\x89PNG\r\n\x1a\n'
+
+
+def _upload(rows, size):
+    content = PNG_HEADER + b'\0' * (size - len(PNG_HEADER))
+
+    def setup():
+        client = fixtures.app(rows).test_client()
+        return lambda: client.post('/upload', data={'file': (io.BytesIO(content), 'upload.png')})
+    return setup
+
+
+def benchmarks(Benchmark, rows=fixtures.DEFAULT_ROWS):
+    return [
+        Benchmark('validate_form[5 fields]', _post('/form', rows, data=FORM)),
+        Benchmark('validate_form[file,1MB]', _upload(rows, 1024 * 1024)),
+        Benchmark('validate_form[file,64MB over limit]', _upload(rows, 64 * 1024 * 1024)),
+        Benchmark(f'validate_db[3 fields,rows={rows}]', _post('/db', rows, data={
+            'email': 'new@example.com', 'username': 'newuser', 'id': str(rows // 2),
+        })),
+        Benchmark(f'validate_db[derived,rejected,rows={rows}]', _post('/db/derived', rows, data={
+            'email': 'x' * 200 + '@example.com', 'username': 'newuser', 'status': 'active',
+        })),
+        Benchmark('stacked[form+db+llm]', _post('/stacked', rows, json={
+            'email': 'new@example.com', 'name': 'The quick brown fox jumps over the lazy dog.',
+        })),
+        Benchmark('validate_llm[1 field]', _post('/llm', rows, json={
+            'text': 'The quick brown fox jumps over the lazy dog.',
+        })),
+    ]
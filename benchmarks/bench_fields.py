@@ -0,0 +1,162 @@
+import io
+
+from werkzeug.datastructures import FileStorage
+
+from flask_validators import Field, Schema, DataValidator
+
+# One representative valid input per built-in validator.
+FIELD_CASES = {
+    'email': ('string', 'jane.doe@example.com', {}),
+    'name': ('string', 'Jane Doe', {}),
+    'age': ('integer', '42', {'args': (0, 120)}),
+    'password': ('string', 's3cret!pass', {'kwargs': {'min_length': 8, 'max_length': 16, 'require_special_char': True}}),
+    'json': ('string', '{"a": [1, 2, 3], "b": {"c": "d"}}', {}),
+    'phone': ('string', '+15551234567', {}),
+    'zipcode': ('string', '12345-6789', {}),
+    'date': ('string', '2024-02-29', {}),
+    'credit_card': ('string', '4111-1111-1111-1111', {}),
+    'ssn': ('string', '123-45-6789', {}),
+    'url': ('string', 'https://example.com/path?q=1', {}),
+    'ip_address': ('string', '192.168.0.1', {}),
+    'hex_color': ('string', '#a1B2c3', {}),
+    'latitude': ('string', '41.7151', {}),
+    'longitude': ('string', '-44.8271', {}),
+    'confirm_password': ('string', 's3cret!pass', {'kwargs': {'password_field': 'password'}}),
+}
+
+
+def _field_benchmark(name, field_type, value, options):
+    def setup():
+        field = Field(required=True, type=field_type, validators=[dict({'name': name}, **options)])
+        context = {'password': value}
+        return lambda: field.validate(value, context)
+    return setup
+
+
+def _file_benchmark():
+    field = Field(required=True, type='file', validators=[
+        {'name': 'file', 'kwargs': {'allowed_extensions': ['jpg', 'png'], 'max_size': 1024 * 1024}}
+    ])
+    upload = FileStorage(stream=io.BytesIO(b'\xff\xd8\xff' + b'0' * 1024), filename='photo.jpg')
+    return lambda: field.validate(upload)
+
+
+def _wide_record(width):
+    return {f'field_{i}': f'user{i}@example.com' for i in range(width)}
+
+
+def _data_validator_benchmark(width):
+    def setup():
+        schema = Schema({
+            f'field_{i}': Field(required=True, type='string', validators=[{'name': 'email'}])
+            for i in range(width)
+        })
+        record = _wide_record(width)
+        return lambda: DataValidator(schema, record).validate()
+    return setup
+
+
+def _data_validator_many_benchmark(width, rows):
+    def setup():
+        schema = Schema({
+            f'field_{i}': Field(required=True, type='string', validators=[{'name': 'email'}])
+            for i in range(width)
+        })
+        records = [_wide_record(width) for _ in range(rows)]
+        return lambda: DataValidator(schema, records).validate_many()
+    return setup
+
+
+def _many_schema(mixed):
+    # Regex validators only, or a mix with a plain and a cross-field one.
+    fields = {
+        'email': Field(required=True, type='string', validators=[{'name': 'email'}]),
+        'zipcode': Field(required=True, type='string', validators=[{'name': 'zipcode'}]),
+    }
+    if mixed:
+        fields['name'] = Field(required=True, type='string', validators=[{'name': 'name'}])
+        fields['password'] = Field(required=True, type='string')
+        fields['confirm'] = Field(required=True, type='string', validators=[
+            {'name': 'confirm_password', 'kwargs': {'password_field': 'password'}}
+        ])
+    return Schema(fields)
+
+
+def _many_records(rows):
+    return [
+        {'email': f'user{i}@example.com', 'zipcode': f'{10000 + i % 500}', 'name': f'User {i}',
+         'password': 's3cret!pass', 'confirm': 's3cret!pass' if i % 50 else 'other'}
+        for i in range(rows)
+    ]
+
+
+def _many_benchmark(mixed, rows, columnar):
+    # validate_many() against the equivalent loop of validate() calls.
+    def setup():
+        schema = _many_schema(mixed)
+        records = _many_records(rows)
+        if columnar:
+            return lambda: DataValidator(schema, records).validate_many()
+        return lambda: [DataValidator(schema, record).validate() for record in records]
+    return setup
+
+
+def _nested_benchmark(items, bad):
+    # A list of order lines; with ``bad`` every line has the wrong type, so
+    # the error cap decides how much of the list is visited.
+    def setup():
+        line = Field(schema={
+            'sku': Field(required=True, type='string'),
+            'qty': Field(required=True, type='integer', validators=[{'name': 'age', 'args': (1, 99)}]),
+        })
+        schema = Schema({'lines': Field(required=True, items=line)})
+        record = {'lines': ['bad'] * items if bad else [{'sku': f'sku{i}', 'qty': 1} for i in range(items)]}
+        return lambda: DataValidator(schema, record).validate()
+    return setup
+
+
+def _schema_benchmark(width):
+    def setup():
+        schema = Schema({
+            f'field_{i}': {'required': True, 'type': 'string', 'validators': [
+                {'name': 'email', 'message': 'Invalid email address.'}
+            ]}
+            for i in range(width)
+        })
+        record = _wide_record(width)
+        return lambda: schema.validate(record)
+    return setup
+
+
+def _compiled_schema_benchmark(width):
+    def setup():
+        schema = Schema({
+            f'field_{i}': {'required': True, 'type': 'string', 'validators': [
+                {'name': 'email', 'message': 'Invalid email address.'}
+            ]}
+            for i in range(width)
+        })
+        validate = schema.compile()
+        record = _wide_record(width)
+        return lambda: validate(record)
+    return setup
+
+
+def benchmarks(Benchmark):
+    cases = [
+        Benchmark(f'field.validate[{name}]', _field_benchmark(name, *case))
+        for name, case in FIELD_CASES.items()
+    ]
+    cases.append(Benchmark('field.validate[file]', _file_benchmark))
+    for width in (3, 50):
+        cases.append(Benchmark(f'schema.validate[width={width}]', _schema_benchmark(width)))
+        cases.append(Benchmark(f'schema.compile()[width={width}]', _compiled_schema_benchmark(width)))
+        cases.append(Benchmark(f'data_validator.validate[width={width}]', _data_validator_benchmark(width)))
+    cases.append(Benchmark('data_validator.validate[nested,items=1000]', _nested_benchmark(1000, False)))
+    cases.append(Benchmark('data_validator.validate[nested,items=100000,bad]', _nested_benchmark(100000, True)))
+    cases.append(Benchmark('data_validator.validate_many[width=10,rows=1000]', _data_validator_many_benchmark(10, 1000)))
+    for mixed in (False, True):
+        kind = 'mixed' if mixed else 'regex'
+        cases.append(Benchmark(f'data_validator.validate_many[{kind},rows=10000]', _many_benchmark(mixed, 10000, True)))
+        cases.append(Benchmark(f'data_validator.validate loop[{kind},rows=10000]', _many_benchmark(mixed, 10000, False)))
+    return cases
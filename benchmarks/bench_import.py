@@ -0,0 +1,27 @@
+import subprocess
+import sys
+
+# Each sample starts a fresh interpreter, so these measure true cold-start
+# import time including the interpreter's own startup (see 'python' below).
+STATEMENTS = {
+    'python': 'pass',
+    'import flask_validators': 'import flask_validators',
+    'from flask_validators import Field': 'from flask_validators import Field',
+    'from flask_validators import validate_form': 'from flask_validators import validate_form',
+    'import flask_validators.models.validate_db': 'import flask_validators.models.validate_db',
+    'import flask_validators.models.validate_llm': 'import flask_validators.models.validate_llm',
+}
+
+
+def _cold_import(statement):
+    def setup():
+        command = [sys.executable, '-c', statement]
+        return lambda: subprocess.run(command, check=True)
+    return setup
+
+
+def benchmarks(Benchmark):
+    return [
+        Benchmark(f'cold_start[{name}]', _cold_import(statement))
+        for name, statement in STATEMENTS.items()
+    ]
@@ -0,0 +1,59 @@
+from flask_validators.models import validate_llm
+
+SHORT_TEXT = 'The quick brown fox jumps over the lazy dog.'
+LONG_TEXT = ' '.join([
+    'Validation libraries spend most of their time on a handful of hot paths,',
+    'and language identification is by far the most expensive of them because',
+    'every byte of input drives the tokenizer state machine before scoring.',
+] * 60)
+# Large enough that scoring it whole takes seconds; sampled, it is bounded.
+HUGE_TEXT = LONG_TEXT * 200
+
+
+def _uncached(text):
+    def setup():
+        validate_llm.load_identifier()
+        validate_llm.set_cache_size(0)
+        return lambda: validate_llm.validate_language(text, 'en')
+    return setup
+
+
+def _cached(text):
+    def setup():
+        validate_llm.load_identifier()
+        validate_llm.set_cache_size(validate_llm.CACHE_SIZE)
+        validate_llm.validate_language(text, 'en')
+        return lambda: validate_llm.validate_language(text, 'en')
+    return setup
+
+
+def _batch(size):
+    def setup():
+        validate_llm.load_identifier()
+        validate_llm.set_cache_size(0)
+        texts = [f'{SHORT_TEXT} Comment number {i}.' for i in range(size)]
+        return lambda: validate_llm.validate_languages(texts, 'en')
+    return setup
+
+
+def _sampled(text, long_text=True):
+    def setup():
+        validate_llm.load_identifier()
+        validate_llm.set_cache_size(0)
+        if long_text:
+            validate_llm.set_long_text()
+        else:
+            validate_llm.set_long_text(None)
+        return lambda: validate_llm.validate_language(text, 'en')
+    return setup
+
+
+def benchmarks(Benchmark):
+    return [
+        Benchmark('validate_language[short]', _uncached(SHORT_TEXT)),
+        Benchmark(f'validate_language[long={len(LONG_TEXT)}B]', _uncached(LONG_TEXT)),
+        Benchmark('validate_language[short,cached]', _cached(SHORT_TEXT)),
+        Benchmark('validate_languages[batch=100]', _batch(100)),
+        Benchmark(f'validate_language[huge={len(HUGE_TEXT)}B,sampled]', _sampled(HUGE_TEXT)),
+        Benchmark(f'validate_language[huge={len(HUGE_TEXT)}B,whole]', _sampled(HUGE_TEXT, long_text=False)),
+    ]
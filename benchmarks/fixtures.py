@@ -0,0 +1,81 @@
+import os
+import tempfile
+
+from flask import Flask, jsonify
+from sqlalchemy import Column, Integer, String, create_engine, insert
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from flask_validators import validate_form, validate_db, validate_llm
+
+DEFAULT_ROWS = 100000
+
+Base = declarative_base()
+
+
+class User(Base):
+    __tablename__ = 'users'
+
+    id = Column(Integer, primary_key=True)
+    email = Column(String(120), unique=True, nullable=False)
+    username = Column(String(40), unique=True, nullable=False)
+    status = Column(String(10), nullable=False)
+
+
+_databases = {}
+
+
+def database(rows=DEFAULT_ROWS):
+    # An on-disk SQLite file, so queries go through a real connection pool
+    # and page cache rather than an in-memory shortcut.
+    if rows not in _databases:
+        directory = tempfile.mkdtemp(prefix='flask_validators_bench_')
+        engine = create_engine(f'sqlite:///{os.path.join(directory, "bench.db")}')
+        Base.metadata.create_all(engine)
+        with engine.begin() as connection:
+            batch = 10000
+            for start in range(0, rows, batch):
+                connection.execute(insert(User), [
+                    {'id': i, 'email': f'user{i}@example.com', 'username': f'user{i}', 'status': 'active'}
+                    for i in range(start + 1, min(start + batch, rows) + 1)
+                ])
+        _databases[rows] = engine, sessionmaker(bind=engine)
+    return _databases[rows]
+
+
+def app(rows=DEFAULT_ROWS):
+    _, Session = database(rows)
+    application = Flask('flask_validators_bench')
+
+    @application.route('/form', methods=['POST'])
+    @validate_form('email', 'name', 'age', 'password', 'confirm_password')
+    def form():
+        return jsonify({'success': True})
+
+    @application.route('/db', methods=['POST'])
+    @validate_db(User, Session, email=['check_unique'], username=['check_null', 'check_unique'], id=['check_existence'])
+    def db():
+        return jsonify({'success': True})
+
+    @application.route('/stacked', methods=['POST'])
+    @validate_form('email', 'name')
+    @validate_db(User, Session, email=['check_unique'])
+    @validate_llm(name=['validate_language'], lang='en')
+    def stacked():
+        return jsonify({'success': True})
+
+    @application.route('/upload', methods=['POST'])
+    @validate_form('file')
+    def upload():
+        return jsonify({'success': True})
+
+    @application.route('/db/derived', methods=['POST'])
+    @validate_db(User, Session, derive=True, email=[], username=['check_null'], status=[])
+    def db_derived():
+        return jsonify({'success': True})
+
+    @application.route('/llm', methods=['POST'])
+    @validate_llm(text=['validate_language'], lang='en')
+    def llm():
+        return jsonify({'success': True})
+
+    return application
@@ -0,0 +1,135 @@
+import gc
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), 'baselines')
+REGRESSION_THRESHOLD = 0.10
+
+
+class Benchmark:
+    def __init__(self, name, setup):
+        # setup() returns the zero-argument callable to time, so expensive
+        # fixtures are only built for the benchmarks that actually run.
+        self.name = name
+        self.setup = setup
+
+
+def _percentile(samples, percent):
+    index = min(int(round(percent / 100 * (len(samples) - 1))), len(samples) - 1)
+    return samples[index]
+
+
+def measure(func, min_time=0.5, max_samples=100000, warmup=10):
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    timer = time.perf_counter_ns
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        deadline = timer() + int(min_time * 1e9)
+        while len(samples) < max_samples and (timer() < deadline or len(samples) < 5):
+            start = timer()
+            func()
+            samples.append(timer() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    samples.sort()
+
+    # Allocations are measured in a separate pass, tracemalloc would
+    # otherwise distort the timings.
+    calls = min(len(samples), 100)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        for _ in range(calls):
+            func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, 'filename') if stat.size_diff > 0)
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+
+    mean = statistics.fmean(samples)
+    return {
+        'samples': len(samples),
+        'ops_per_sec': 1e9 / mean if mean else float('inf'),
+        'mean_us': mean / 1000,
+        'p50_us': _percentile(samples, 50) / 1000,
+        'p95_us': _percentile(samples, 95) / 1000,
+        'p99_us': _percentile(samples, 99) / 1000,
+        'peak_bytes': peak,
+        'retained_bytes_per_call': allocated / calls,
+        'retained_blocks_per_call': blocks / calls,
+    }
+
+
+def run(benchmarks, min_time=0.5, name_filter=None, out=print):
+    results = {}
+    out(f'{"benchmark":<56} {"ops/s":>12} {"p50 us":>10} {"p95 us":>10} {"p99 us":>10} {"peak KiB":>9}')
+    for benchmark in benchmarks:
+        if name_filter and name_filter not in benchmark.name:
+            continue
+        func = benchmark.setup()
+        result = measure(func, min_time=min_time)
+        results[benchmark.name] = result
+        out(f'{benchmark.name:<56} {result["ops_per_sec"]:>12,.0f} {result["p50_us"]:>10.1f} '
+            f'{result["p95_us"]:>10.1f} {result["p99_us"]:>10.1f} {result["peak_bytes"] / 1024:>9.1f}')
+    return results
+
+
+def environment():
+    from importlib.metadata import version, PackageNotFoundError
+    packages = {}
+    for package in ('flask_validators', 'flask', 'SQLAlchemy', 'langid', 'numpy'):
+        try:
+            packages[package] = version(package)
+        except PackageNotFoundError:
+            packages[package] = None
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'packages': packages,
+    }
+
+
+def save(results, name):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = name if name.endswith('.json') else os.path.join(BASELINE_DIR, f'{name}.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=2, sort_keys=True)
+    return path
+
+
+def load(path):
+    if not os.path.exists(path):
+        path = os.path.join(BASELINE_DIR, f'{path}.json')
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD, out=print):
+    # A benchmark regresses when its median latency grew by more than
+    # ``threshold`` relative to the baseline.
+    regressions = []
+    out(f'{"benchmark":<56} {"p50 before":>11} {"p50 after":>10} {"change":>8}')
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]['p50_us']
+        after = result['p50_us']
+        change = (after - before) / before if before else 0.0
+        marker = '  REGRESSION' if change > threshold else ''
+        out(f'{name:<56} {before:>11.1f} {after:>10.1f} {change:>+8.1%}{marker}')
+        if change > threshold:
+            regressions.append(name)
+    return regressions
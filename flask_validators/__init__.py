@@ -1,7 +1,28 @@
-from .decorators.validation_decorator import validate_form, validate_db, validate_llm
+import importlib
+
 from .models.schema import Schema
 from .models.fields import Field
 from .controllers.validator import DataValidator
 
+# The decorators need Flask's request machinery; they are imported on first
+# use so that code using only Field/Schema/DataValidator starts faster.
+_LAZY_ATTRIBUTES = {
+    "validate_form": ".decorators.validation_decorator",
+    "validate_db": ".decorators.validation_decorator",
+    "validate_llm": ".decorators.validation_decorator",
+    "validate_stream": ".decorators.validation_decorator",
+    "validated_data": ".controllers.payload",
+    "warmup": ".prefork",
+}
+
+
+__all__ = ["validate_form", "Schema", "Field", "DataValidator", "validate_db", 'validate_llm', 'validate_stream', 'validated_data', 'warmup']
+
 
-__all__ = ["validate_form", "Schema", "Field", "DataValidator", "validate_db", 'validate_llm']
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
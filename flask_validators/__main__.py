@@ -0,0 +1,6 @@
+import sys
+
+from flask_validators.batch import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,356 @@
+import argparse
+import codecs
+import collections
+import csv
+import importlib
+import json
+import os
+import re
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+from flask_validators.controllers.stream import cell_converter, csv_records, ndjson_records
+from flask_validators.controllers.validator import DataValidator, is_rule_schema
+from flask_validators.models.schema import Schema
+
+DEFAULT_CHUNK_BYTES = 8 * 1024 * 1024
+DEFAULT_BATCH_RECORDS = 10000
+PROGRESS_INTERVAL = 1.0
+READ_BLOCK_BYTES = 1024 * 1024
+# Largest single element of a JSON array, in characters of decoded text.
+MAX_RECORD_CHARS = 16 * 1024 * 1024
+# A decode error this close to the end of the buffer may only mean the
+# element was cut short ('tru' of 'true', '{"a"' of '{"a": 1}').
+TRUNCATION_CHARS = 16
+
+FORMATS = ('ndjson', 'csv', 'json')
+
+# Characters that may still belong to a number decoded at the end of the
+# buffer: with only these left, the next block can extend it.
+NUMBER_TAIL_RE = re.compile(r'[0-9.eE+-]*\Z')
+
+# Set once per worker process by _init_worker, so every chunk a worker
+# handles reuses the same loaded and compiled schema.
+_validate_records = None
+_convert_cells = None
+
+
+def load_schema(spec):
+    # ``package.module:attribute``; the attribute defaults to ``schema``.
+    # A plain dict of fields is wrapped in a Schema.
+    module_name, _, attribute = spec.partition(':')
+    schema = getattr(importlib.import_module(module_name), attribute or 'schema')
+    if isinstance(schema, dict):
+        schema = Schema(schema)
+    return schema
+
+
+def record_validator(schema):
+    # Returns a function mapping a list of records to their error dicts.
+    # Rule-dict schemas run their generated code per record; Field schemas
+    # validate the whole list column by column.
+    if is_rule_schema(schema):
+        validate = schema.compile()
+        return lambda records: [validate(record) for record in records]
+    return lambda records: DataValidator(schema, records).validate_many()['errors']
+
+
+def _init_worker(schema_spec):
+    global _validate_records, _convert_cells
+    schema = load_schema(schema_spec)
+    _validate_records = record_validator(schema)
+    _convert_cells = cell_converter(schema)
+
+
+def _check(entries):
+    # entries are (position, record, parse error) tuples; returns the
+    # failing positions in order with their errors.
+    records = [record for _, record, error in entries if error is None]
+    results = iter(_validate_records(records) if records else ())
+    errors = []
+    for position, record, error in entries:
+        if error is None:
+            error = next(results)
+        if error:
+            errors.append((position, error))
+    return errors
+
+
+def _range_lines(path, start, end, counter):
+    with open(path, 'rb') as stream:
+        stream.seek(start)
+        position = start
+        while position < end:
+            line = stream.readline()
+            if not line:
+                return
+            position += len(line)
+            counter[0] += 1
+            yield line
+
+
+def _validate_range(task):
+    # One byte range of an NDJSON or CSV file, always starting and ending on
+    # a line boundary. Returns (lines, records, errors) with line numbers
+    # relative to the start of the range.
+    format, path, start, end, header = task
+    counter = [0]
+    lines = _range_lines(path, start, end, counter)
+    if format == 'csv':
+        entries = list(csv_records(lines, header))
+        if _convert_cells is not None:
+            entries = [(position, record if error is not None else _convert_cells(record), error)
+                       for position, record, error in entries]
+    else:
+        entries = list(ndjson_records(lines))
+    return counter[0], len(entries), _check(entries)
+
+
+def _validate_batch(records):
+    entries = [(position, record, None) if isinstance(record, dict) else (position, None, 'Expected a JSON object.')
+               for position, record in enumerate(records)]
+    return 0, len(entries), _check(entries)
+
+
+def _next_line_start(stream, offset, size):
+    # Offset of the first line starting at or after ``offset``, found by
+    # reading blocks rather than one line that may be arbitrarily long.
+    if offset >= size:
+        return size
+    if offset <= 0:
+        return 0
+    stream.seek(offset - 1)
+    while True:
+        block = stream.read(READ_BLOCK_BYTES)
+        if not block:
+            return size
+        newline = block.find(b'\n')
+        if newline != -1:
+            return stream.tell() - len(block) + newline + 1
+
+
+def _csv_header(path):
+    # (header, offset of the first data row).
+    with open(path, 'rb') as stream:
+        first = stream.readline()
+    return next(csv.reader([first.decode('utf-8-sig')]), None), len(first)
+
+
+def _range_tasks(format, path, chunk_bytes, progress):
+    size = os.path.getsize(path)
+    header, start = (None, 0)
+    if format == 'csv':
+        header, start = _csv_header(path)
+        if header is None:
+            return
+    with open(path, 'rb') as stream:
+        while start < size:
+            end = _next_line_start(stream, start + chunk_bytes, size)
+            progress['read'] = end
+            yield (format, path, start, end, header)
+            start = end
+
+
+def _cut_short(error, buffer):
+    # Whether a decode error can be the end of the buffer rather than bad
+    # JSON. An unterminated string always ran into the end of the buffer.
+    return error.msg.startswith('Unterminated string') or len(buffer) - error.pos <= TRUNCATION_CHARS
+
+
+def json_array_records(stream, block_bytes=READ_BLOCK_BYTES, max_record_chars=MAX_RECORD_CHARS):
+    # Yields the elements of a top-level JSON array read from a binary
+    # stream, holding at most one block plus the element being decoded.
+    # Malformed elements raise as soon as they are seen, and an element
+    # longer than ``max_record_chars`` raises instead of being buffered.
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer = ''
+    position = 0
+    state = 'start'
+    eof = False
+
+    def more():
+        nonlocal buffer, position, eof
+        if eof:
+            raise ValueError('Unexpected end of JSON array.')
+        if len(buffer) - position > max_record_chars:
+            raise ValueError(f'JSON array element exceeds {max_record_chars} characters.')
+        block = stream.read(block_bytes)
+        eof = not block
+        buffer = buffer[position:] + text_decoder.decode(block, final=eof)
+        position = 0
+
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n':
+            position += 1
+        if position >= len(buffer):
+            more()
+            continue
+
+        char = buffer[position]
+        if state == 'start':
+            if char != '[':
+                raise ValueError('Expected a JSON array.')
+            position += 1
+            state = 'first'
+            continue
+        if char == ']' and state in ('first', 'next'):
+            return
+        if state == 'next':
+            if char != ',':
+                raise ValueError(f'Expected "," or "]" in JSON array, got {char!r}.')
+            position += 1
+            state = 'value'
+            continue
+
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as error:
+            # Read on only if the element may continue in the next block.
+            if eof or not _cut_short(error, buffer):
+                raise
+            more()
+            continue
+        if not eof and NUMBER_TAIL_RE.match(buffer, end):
+            # A number at the end of the buffer may be cut short, even when
+            # it decoded: '-5000000000' of '-5000000000.0' is a valid number.
+            more()
+            continue
+        yield record
+        position = end
+        state = 'next'
+
+
+def _batch_tasks(path, batch_records, progress):
+    with open(path, 'rb') as stream:
+        batch = []
+        for record in json_array_records(stream):
+            batch.append(record)
+            if len(batch) >= batch_records:
+                progress['read'] = stream.tell()
+                yield batch
+                batch = []
+        progress['read'] = stream.tell()
+        if batch:
+            yield batch
+
+
+def _inline(function, tasks):
+    for task in tasks:
+        yield function(task)
+
+
+def _ordered(executor, function, tasks, window):
+    # Results in submission order, with at most ``window`` tasks in flight,
+    # so neither pending input nor finished output piles up in memory.
+    pending = collections.deque()
+    for task in tasks:
+        pending.append(executor.submit(function, task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension == '.json':
+        return 'json'
+    return 'ndjson'
+
+
+def validate_file(schema_spec, path, output, format=None, workers=None, chunk_bytes=DEFAULT_CHUNK_BYTES,
+                  batch_records=DEFAULT_BATCH_RECORDS, max_errors=None, progress_stream=None):
+    # Validates every record of ``path`` and writes one NDJSON line per
+    # invalid record to ``output``: {"line": n, "errors": {...}} for NDJSON
+    # and CSV (1-based physical line), {"index": i, ...} for a JSON array.
+    # Returns the summary also printed at the end of a CLI run.
+    format = format or detect_format(path)
+    workers = workers or os.cpu_count() or 1
+    size = os.path.getsize(path)
+    progress = {'read': 0}
+
+    if format == 'json':
+        function, tasks, key = _validate_batch, _batch_tasks(path, batch_records, progress), 'index'
+        base = 0
+    else:
+        function, tasks, key = _validate_range, _range_tasks(format, path, chunk_bytes, progress), 'line'
+        base = 1 if format == 'csv' else 0
+
+    summary = {'records': 0, 'invalid': 0, 'stopped': False}
+    started = last_report = time.monotonic()
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(schema_spec,))
+        results = _ordered(executor, function, tasks, workers * 2)
+    else:
+        _init_worker(schema_spec)
+        results = _inline(function, tasks)
+
+    try:
+        for lines, records, errors in results:
+            offset = base if key == 'line' else summary['records']
+            for position, error in errors:
+                output.write(json.dumps({key: offset + position, 'errors': error}) + '\n')
+            base += lines
+            summary['records'] += records
+            summary['invalid'] += len(errors)
+
+            if progress_stream is not None and time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                _report_progress(progress_stream, summary, progress['read'], size, last_report - started)
+            if max_errors is not None and summary['invalid'] >= max_errors:
+                summary['stopped'] = True
+                break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    summary['seconds'] = round(time.monotonic() - started, 3)
+    return summary
+
+
+def _report_progress(stream, summary, read, size, elapsed):
+    done = read / size if size else 1
+    rate = summary['records'] / elapsed if elapsed else 0
+    stream.write(f'{done:6.1%}  {summary["records"]:,} records  {summary["invalid"]:,} invalid  {rate:,.0f} records/s\n')
+    stream.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m flask_validators',
+                                     description='Validate a CSV, NDJSON or JSON-array file against a schema.')
+    parser.add_argument('schema', help='schema to validate against, as package.module:attribute')
+    parser.add_argument('input', help='file to validate')
+    parser.add_argument('-f', '--format', choices=FORMATS, help='input format (default: from the file extension)')
+    parser.add_argument('-o', '--output', default='-', help='NDJSON error report (default: stdout)')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(), help='worker processes')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_BYTES,
+                        help='bytes of NDJSON or CSV per task')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_RECORDS,
+                        help='JSON-array records per task')
+    parser.add_argument('--max-errors', type=int, help='stop after this many invalid records')
+    parser.add_argument('-q', '--quiet', action='store_true', help='no progress or summary on stderr')
+    args = parser.parse_args(argv)
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        summary = validate_file(args.schema, args.input, output, format=args.format, workers=args.workers,
+                                chunk_bytes=args.chunk_size, batch_records=args.batch_size,
+                                max_errors=args.max_errors, progress_stream=None if args.quiet else sys.stderr)
+    except (ImportError, AttributeError, OSError, ValueError) as error:
+        print(f'error: {error}', file=sys.stderr)
+        return 2
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    if not args.quiet:
+        stopped = ' (stopped at --max-errors)' if summary['stopped'] else ''
+        print(f'{summary["records"]:,} records, {summary["invalid"]:,} invalid, '
+              f'{summary["seconds"]:.1f}s{stopped}', file=sys.stderr)
+    return 1 if summary['invalid'] else 0
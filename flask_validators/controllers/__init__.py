@@ -1,4 +1,27 @@
+import importlib
+
 from .validator import DataValidator
-from .error_handler import ErrorHandler
 
-__all__ = ["DataValidator", "ErrorHandler"]
\ No newline at end of file
+_LAZY_ATTRIBUTES = {
+    "ErrorHandler": ".error_handler",
+    "RecordStream": ".stream",
+    "StreamValidationError": ".stream",
+    "set_max_workers": ".executor",
+    "UploadGuard": ".upload",
+    "guard_uploads": ".upload",
+    "request_data": ".payload",
+    "validated_data": ".payload",
+    "Limits": ".admission",
+    "LimitExceeded": ".admission",
+}
+
+__all__ = ["DataValidator", "ErrorHandler", "RecordStream", "StreamValidationError", "set_max_workers", "UploadGuard", "guard_uploads", "request_data", "validated_data", "Limits", "LimitExceeded"]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,94 @@
+import re
+
+from array import array
+from itertools import accumulate
+
+# A JSON string literal, so brackets inside strings are not counted.
+JSON_STRING_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"')
+_NOT_BRACKETS = bytes(byte for byte in range(256) if byte not in b'[]{}')
+# Opening brackets become +1 and closing ones -1 once read as signed bytes.
+_DEPTH_STEPS = bytes.maketrans(b'[{]}', b'\x01\x01\xff\xff')
+
+
+class LimitExceeded(Exception):
+    def __init__(self, errors, status_code=400):
+        super().__init__(errors)
+        self.errors = errors
+        self.status_code = status_code
+
+
+def json_depth(body):
+    # Deepest nesting of arrays and objects in a JSON document, without
+    # decoding it: strings are blanked out, then the brackets summed up.
+    structure = JSON_STRING_RE.sub(b'', body).translate(None, _NOT_BRACKETS)
+    if not structure:
+        return 0
+    return max(accumulate(array('b', structure.translate(_DEPTH_STEPS))))
+
+
+def _lower(request, name, limit):
+    # Werkzeug enforces these while it reads and parses the body. Older
+    # Flask versions cannot set them per request; the checks on the headers
+    # and on the parsed data still apply there.
+    current = getattr(request, name)
+    if current is None or limit < current:
+        try:
+            setattr(request, name, limit)
+        except AttributeError:
+            pass
+
+
+class Limits:
+    # Admission limits of one decorator. admit() runs before the body is
+    # parsed and check_data() on the parsed fields; both raise LimitExceeded.
+
+    __slots__ = ('max_body_bytes', 'max_fields', 'max_field_length', 'max_json_depth')
+
+    def __init__(self, max_body_bytes=None, max_fields=None, max_field_length=None, max_json_depth=None):
+        self.max_body_bytes = max_body_bytes
+        self.max_fields = max_fields
+        self.max_field_length = max_field_length
+        self.max_json_depth = max_json_depth
+
+    @classmethod
+    def from_arg(cls, limits):
+        if limits is None or isinstance(limits, cls):
+            return limits
+        return cls(**limits)
+
+    def admit(self, request):
+        if self.max_body_bytes is not None:
+            if request.content_length is not None and request.content_length > self.max_body_bytes:
+                raise LimitExceeded({'error': 'Request body is too large.'}, 413)
+            # Bodies without a Content-Length stop being read at the limit.
+            _lower(request, 'max_content_length', self.max_body_bytes)
+
+        if request.mimetype == 'multipart/form-data':
+            # The multipart parser counts parts and field sizes as it goes.
+            if self.max_fields is not None:
+                _lower(request, 'max_form_parts', self.max_fields)
+            if self.max_field_length is not None:
+                _lower(request, 'max_form_memory_size', self.max_field_length)
+            return
+
+        if request.is_json:
+            if self.max_json_depth is None:
+                return
+            body = request.get_data(cache=True)
+            # Nesting can never be deeper than the number of opening brackets.
+            if body.count(b'[') + body.count(b'{') > self.max_json_depth and json_depth(body) > self.max_json_depth:
+                raise LimitExceeded({'error': 'JSON nesting is too deep.'})
+        elif self.max_fields is not None and request.mimetype == 'application/x-www-form-urlencoded':
+            body = request.get_data(cache=True)
+            if body and body.count(b'&') >= self.max_fields:
+                raise LimitExceeded({'error': 'Too many fields.'})
+
+    def check_data(self, data):
+        if not isinstance(data, dict):
+            return
+        if self.max_fields is not None and len(data) > self.max_fields:
+            raise LimitExceeded({'error': 'Too many fields.'})
+        if self.max_field_length is not None:
+            for field, value in data.items():
+                if isinstance(value, str) and len(value) > self.max_field_length:
+                    raise LimitExceeded({field: 'Value is too long.'})
@@ -0,0 +1,47 @@
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = 8
+
+_executor = None
+_max_workers = MAX_WORKERS
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    # One bounded pool per process, shared by every decorator running in
+    # parallel mode, so concurrent requests cannot multiply the thread count.
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=_max_workers,
+                                               thread_name_prefix='flask_validators')
+    return _executor
+
+
+def get_max_workers():
+    return _max_workers
+
+
+def set_max_workers(max_workers):
+    global _executor, _max_workers
+    with _executor_lock:
+        previous, _executor = _executor, None
+        _max_workers = max_workers
+    if previous is not None:
+        previous.shutdown(wait=False)
+
+
+def run_parallel(calls):
+    # Runs (func, args) pairs on the shared pool and returns their results in
+    # the order given, whatever order they finish in. The last call runs on
+    # the calling thread, which would otherwise sit idle waiting.
+    if not calls:
+        return []
+    executor = get_executor()
+    futures = [executor.submit(func, *args) for func, args in calls[:-1]]
+    func, args = calls[-1]
+    last = func(*args)
+    return [future.result() for future in futures] + [last]
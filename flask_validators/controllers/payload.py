@@ -0,0 +1,35 @@
+from flask import g, request
+
+# Attributes on ``flask.g``: the body as parsed once for the request, and
+# the values the validation decorators have accepted so far.
+DATA_ATTRIBUTE = 'validators_data'
+VALIDATED_ATTRIBUTE = 'validated_data'
+
+
+def request_data(limits=None):
+    # The request body as a dict, parsed on first use and shared by every
+    # decorator stacked on the view, so the body is read and decoded once.
+    # ``limits`` (admission.Limits) are checked before and after parsing.
+    if limits is not None:
+        limits.admit(request)
+    data = g.get(DATA_ATTRIBUTE)
+    if data is None:
+        if request.is_json:
+            data = request.get_json()
+        else:
+            data = request.form.to_dict()
+        setattr(g, DATA_ATTRIBUTE, data)
+    if limits is not None:
+        limits.check_data(data)
+    return data
+
+
+def validated_data():
+    # Field values accepted by the decorators on this request, coerced to
+    # their field types (json fields hold the parsed document). The view
+    # reads its input from here instead of parsing the body again.
+    data = g.get(VALIDATED_ATTRIBUTE)
+    if data is None:
+        data = {}
+        setattr(g, VALIDATED_ATTRIBUTE, data)
+    return data
@@ -0,0 +1,158 @@
+import codecs
+import csv
+import json
+
+from flask_validators.controllers.validator import DataValidator, is_rule_schema
+
+MAX_LINE_BYTES = 1024 * 1024
+MAX_REPORTED_ERRORS = 100
+
+BOOLEAN_CELLS = {'true': True, 'false': False, '1': True, '0': False}
+
+
+class StreamValidationError(Exception):
+    pass
+
+
+def _boolean_cell(cell):
+    return BOOLEAN_CELLS[cell.lower()]
+
+
+CELL_CONVERSIONS = {
+    'integer': int,
+    'float': float,
+    'boolean': _boolean_cell,
+}
+
+
+def cell_converter(schema):
+    # CSV cells are always strings. Field schemas coerce them to the field
+    # type themselves; rule-dict schemas check types strictly, so typed
+    # cells are converted first. A cell that does not convert is left as is
+    # and fails the type check.
+    conversions = {
+        field: CELL_CONVERSIONS[field_rules['type']]
+        for field, field_rules in schema.fields.items()
+        if isinstance(field_rules, dict) and field_rules.get('type') in CELL_CONVERSIONS
+    }
+    if not conversions:
+        return None
+
+    def convert(record):
+        for field, conversion in conversions.items():
+            cell = record.get(field)
+            if cell is None:
+                continue
+            try:
+                record[field] = conversion(cell)
+            except (ValueError, KeyError):
+                pass
+        return record
+    return convert
+
+
+def record_validator(schema):
+    # Returns a function mapping one record to its error dict: the compiled
+    # code of a rule-dict schema, or DataValidator for Field schemas.
+    if is_rule_schema(schema):
+        return schema.compile()
+    return lambda record: DataValidator(schema, record).validate()
+
+
+class RecordStream:
+    # Iterates the valid records of an NDJSON or CSV body while it is being
+    # read. Invalid records are counted and the first ``max_reported_errors``
+    # are kept for the response, so memory stays bounded whatever the size
+    # of the upload. Once ``max_errors`` records have failed, iteration stops
+    # with a StreamValidationError.
+
+    def __init__(self, schema, stream, format='ndjson', max_errors=None,
+                 max_reported_errors=MAX_REPORTED_ERRORS, max_line_bytes=MAX_LINE_BYTES):
+        self.schema = schema
+        self.stream = stream
+        self.format = format
+        self.max_errors = max_errors
+        self.max_reported_errors = max_reported_errors
+        self.max_line_bytes = max_line_bytes
+        self.errors = []
+        self.error_count = 0
+        self.record_count = 0
+        self._validate = record_validator(schema)
+        self._convert_cells = cell_converter(schema) if format == 'csv' else None
+
+    def __iter__(self):
+        records = self._csv_records() if self.format == 'csv' else self._ndjson_records()
+        validate = self._validate
+        convert_cells = self._convert_cells
+        for line_number, record, error in records:
+            self.record_count += 1
+            if error is None:
+                if convert_cells is not None:
+                    record = convert_cells(record)
+                error = validate(record)
+            if not error:
+                yield record
+                continue
+
+            self.error_count += 1
+            if len(self.errors) < self.max_reported_errors:
+                self.errors.append({'line': line_number, 'errors': error})
+            if self.max_errors is not None and self.error_count >= self.max_errors:
+                raise StreamValidationError(self.report())
+
+    def report(self):
+        return {
+            'records': self.record_count,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+
+    def _lines(self):
+        readline = self.stream.readline
+        while True:
+            line = readline(self.max_line_bytes + 1)
+            if not line:
+                return
+            if len(line) > self.max_line_bytes:
+                raise StreamValidationError({'error': f'Line exceeds {self.max_line_bytes} bytes.'})
+            yield line
+
+    def _ndjson_records(self):
+        return ndjson_records(self._lines())
+
+    def _csv_records(self):
+        return csv_records(self._lines())
+
+
+def ndjson_records(lines):
+    # (line number, record, error) for each non-blank line of NDJSON bytes.
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line_number, None, 'Invalid JSON.'
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, 'Expected a JSON object.'
+            continue
+        yield line_number, record, None
+
+
+def csv_records(lines, header=None):
+    # Same for CSV bytes. Without ``header`` the first row is the header;
+    # with it, ``lines`` starts at a data row (a chunk of a larger file).
+    reader = csv.reader(codecs.iterdecode(lines, 'utf-8'))
+    if header is None:
+        header = next(reader, None)
+        if header is None:
+            return
+    for row in reader:
+        if not row:
+            continue
+        if len(row) != len(header):
+            yield reader.line_num, None, f'Expected {len(header)} columns.'
+            continue
+        # An empty cell is a missing value, not an empty string.
+        yield reader.line_num, {key: value if value != '' else None for key, value in zip(header, row)}, None
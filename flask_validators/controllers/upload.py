@@ -0,0 +1,76 @@
+from werkzeug.formparser import FormDataParser, MultiPartParser, default_stream_factory
+
+from flask_validators.models.files import (UploadRejected, UploadTooLarge, UploadSpool,
+                                           expected_content_types, file_extension)
+
+
+class UploadGuard:
+    # Stream factory for the multipart parser. ``rules`` maps a form field to
+    # the keyword arguments of its ``file`` validator; uploads to those fields
+    # are written to an UploadSpool that enforces them while the body streams.
+
+    def __init__(self, rules):
+        self.rules = rules
+
+    def __call__(self, total_content_length, content_type, filename, content_length=None, name=None):
+        rule = self.rules.get(name)
+        if rule is None:
+            return default_stream_factory(total_content_length=total_content_length, content_type=content_type,
+                                          filename=filename, content_length=content_length)
+
+        message = rule.get('message')
+        allowed_extensions = rule.get('allowed_extensions')
+        if allowed_extensions and file_extension(filename) not in allowed_extensions:
+            raise UploadRejected(name, message or 'Invalid file extension.')
+
+        max_size = rule.get('max_size')
+        if max_size and content_length and content_length > max_size:
+            raise UploadTooLarge(name, message or 'File size is too large.')
+
+        return UploadSpool(name, max_size, expected_content_types(filename, rule.get('allowed_types')),
+                           rule.get('hash'), message)
+
+
+class UploadMultiPartParser(MultiPartParser):
+    def start_file_streaming(self, event, total_content_length):
+        # Same as Werkzeug's, plus the form field name so the guard knows
+        # which rule applies.
+        try:
+            content_length = int(event.headers['content-length'])
+        except (KeyError, ValueError):
+            content_length = 0
+        return self.stream_factory(
+            total_content_length=total_content_length,
+            filename=event.filename,
+            content_type=event.headers.get('content-type'),
+            content_length=content_length,
+            name=event.name,
+        )
+
+
+class UploadFormDataParser(FormDataParser):
+    def _parse_multipart(self, stream, mimetype, content_length, options):
+        parser = UploadMultiPartParser(
+            stream_factory=self.stream_factory,
+            max_form_memory_size=self.max_form_memory_size,
+            max_form_parts=self.max_form_parts,
+            cls=self.cls,
+        )
+        boundary = options.get('boundary', '').encode('ascii')
+
+        if not boundary:
+            raise ValueError('Missing boundary')
+
+        form, files = parser.parse(stream, boundary, content_length)
+        return stream, form, files
+
+
+def guard_uploads(request, rules):
+    # Must run before anything reads request.form or request.files; once the
+    # body is parsed the limits can only be checked afterwards.
+    request = request._get_current_object()
+    if not rules or 'form' in request.__dict__:
+        return False
+    request.form_data_parser_class = UploadFormDataParser
+    request._get_file_stream = UploadGuard(rules)
+    return True
@@ -1,16 +1,70 @@
+from flask_validators.models.nested import DEFAULT_MAX_ERRORS, validate_fields, validate_value
+
+
+def is_rule_schema(schema):
+    # Whether ``schema`` is made of rule dicts, which Schema.validate and
+    # Schema.compile check, rather than of Field objects, which DataValidator
+    # checks. A schema mixing both is rejected.
+    kinds = {isinstance(field, dict) for field in schema.fields.values()}
+    if len(kinds) > 1:
+        raise ValueError('A schema cannot mix rule dicts and Field objects.')
+    return kinds == {True}
+
+
 class DataValidator:
     def __init__(self, schema, data):
         self.schema = schema
         self.data = data
+        self.stopped = False
+
+    def validate(self, max_errors=DEFAULT_MAX_ERRORS):
+        # Errors of nested fields are keyed by JSON pointer ('/items/3/sku').
+        # Validation stops after ``max_errors`` errors and sets ``stopped``.
+        errors, self.stopped = validate_fields(self.schema.fields, self.data, max_errors)
+        return errors
+
+    def validate_many(self, records=None):
+        # Validate a list of records column by column: each field's checks run
+        # once over all of its values instead of once per row.
+        records = self.data if records is None else records
+        row_errors = [{} for _ in records]
+        field_errors = {}
 
-    def validate(self):
-        errors = {}
         for field_name, field in self.schema.fields.items():
-            value = self.data.get(field_name)
-            if value is None and field.required:
-                errors[field_name] = 'This field is required.'
-            elif value is not None:
-                is_valid, error_message = field.validate(value)
-                if not is_valid:
-                    errors[field_name] = error_message
-        return errors
\ No newline at end of file
+            if field.nested:
+                # Documents do not split into columns. Each one is walked
+                # like validate() does, so every nested error gets its own
+                # JSON pointer key.
+                failed = 0
+                for record, errors in zip(records, row_errors):
+                    before = len(errors)
+                    validate_value(field, record.get(field_name), field_name, record, errors)
+                    failed += len(errors) > before
+                if failed:
+                    field_errors[field_name] = failed
+                continue
+
+            column = [record.get(field_name) for record in records]
+            # Optional fields skip missing values, exactly like validate().
+            if not field.required and None in column:
+                positions = [position for position, value in enumerate(column) if value is not None]
+                column = [column[position] for position in positions]
+                contexts = [records[position] for position in positions]
+            else:
+                positions = None
+                contexts = records
+
+            errors = field.validate_column(column, contexts)
+            for position, error_message in errors.items():
+                row = positions[position] if positions is not None else position
+                row_errors[row][field_name] = error_message
+            if errors:
+                field_errors[field_name] = len(errors)
+
+        invalid = sum(1 for errors in row_errors if errors)
+        return {
+            'errors': row_errors,
+            'valid': len(records) - invalid,
+            'invalid': invalid,
+            'field_errors': field_errors,
+        }
\ No newline at end of file
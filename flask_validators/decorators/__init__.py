@@ -1,4 +1,4 @@
 
-from .validation_decorator import validate_form, validate_db, validate_llm
+from .validation_decorator import validate_form, validate_db, validate_llm, validate_stream
 
-__all__ = ["validate_form", "validate_db"]
\ No newline at end of file
+__all__ = ["validate_form", "validate_db", "validate_stream"]
\ No newline at end of file
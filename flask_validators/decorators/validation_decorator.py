@@ -1,11 +1,27 @@
-from functools import wraps
-from flask import request, jsonify
-from flask_validators.controllers.validator import DataValidator
+import asyncio
+import importlib
+import inspect
+import sys
+
+from functools import partial, wraps
+from flask import request, jsonify, g
+from werkzeug.exceptions import RequestEntityTooLarge
+from flask_validators.controllers.validator import DataValidator, is_rule_schema
+from flask_validators.controllers.error_handler import ErrorHandler
+from flask_validators.controllers.stream import RecordStream, StreamValidationError
+from flask_validators.controllers.executor import run_parallel
+from flask_validators.controllers.upload import guard_uploads
+from flask_validators.controllers.payload import request_data, validated_data
+from flask_validators.controllers.admission import Limits, LimitExceeded
+from flask_validators.models.files import UploadRejected
+from flask_validators import instrumentation
 from flask_validators.models.schema import Schema
 from flask_validators.models.fields import Field
-from flask_validators.models.validate_db import check_unique, check_null, check_existence, check_range, check_type, check_enum, check_length
-from flask_validators.models.validate_llm import validate_language
-from sqlalchemy.orm import sessionmaker
+
+# Validators each decorator accepts by name. Their modules pull in SQLAlchemy
+# and langid, so they are only imported the first time a view needs them.
+DB_VALIDATORS = ('check_unique', 'check_null', 'check_existence', 'check_range', 'check_type', 'check_enum', 'check_length', 'check_column')
+LLM_VALIDATORS = ('validate_language',)
 
 field_schemas = {
     'email': Field(required=True, type='string', validators=[
@@ -61,112 +77,492 @@ field_schemas = {
     ]),
 }
 
-def validate_form(*fields):
-    def decorator(f):
-        @wraps(f)
-        def decorated_function(*args, **kwargs):
-            data = request.form.to_dict()
-            file_data = {k: v for k, v in request.files.items() if k in fields}
+for _name, _field in field_schemas.items():
+    _field.bind_name(_name)
 
-            if not data and not file_data:
-                return jsonify({'error': 'No data provided.'}), 400
+def _upload_rules(fields):
+    # The ``file`` validator arguments of each requested field, enforced while
+    # the upload streams instead of after Werkzeug has spooled all of it.
+    rules = {}
+    for field in fields:
+        schema = field_schemas.get(field)
+        if schema is None:
+            continue
+        for validator in schema.validators:
+            if validator['name'] == 'file':
+                rules[field] = dict(validator.get('kwargs', {}), message=validator.get('message'))
+    return rules
 
-            errors = {}
-            for field in fields:
-                if field not in field_schemas:
-                    continue
+def _form_errors(fields, upload_rules=None, limits=None):
+    guard_uploads(request, upload_rules)
+    try:
+        data = request_data(limits)
+        file_data = {k: v for k, v in request.files.items() if k in fields}
+    except UploadRejected as error:
+        return {error.field: error.message}, error.status_code
+    except LimitExceeded as error:
+        return error.errors, error.status_code
+    except RequestEntityTooLarge:
+        return {'error': 'Request body is too large.'}, 413
 
-                schema = field_schemas[field]
-                schema.data = data  # Pass the whole data
-                value = data.get(field) if field in data else file_data.get(field)
+    if not data and not file_data:
+        return {'error': 'No data provided.'}, 400
 
-                if not value:
-                    errors[field] = "Missing data"
-                    continue
+    errors = {}
+    cleaned = {}
+    for field in fields:
+        if field not in field_schemas:
+            continue
+
+        schema = field_schemas[field]
+        value = data.get(field) if field in data else file_data.get(field)
+
+        if not value:
+            errors[field] = "Missing data"
+            continue
+
+        # The whole form is passed per call for cross-field validators such
+        # as confirm_password; the shared Field itself is never modified.
+        is_valid, error_message, value = schema.clean(value, context=data)
+        if not is_valid:
+            errors[field] = error_message
+        else:
+            cleaned[field] = value
+
+    if not errors:
+        # Coerced values replace whatever an outer decorator stored raw.
+        validated_data().update(cleaned)
+    return errors, 400
 
-                is_valid, error_message = schema.validate(value)
-                if not is_valid:
-                    errors[field] = error_message
+def validate_form(*fields, limits=None):
+    upload_rules = _upload_rules(fields)
+    limits = Limits.from_arg(limits)
 
+    def decorator(f):
+        if inspect.iscoroutinefunction(f):
+            @wraps(f)
+            async def async_decorated_function(*args, **kwargs):
+                errors, status_code = _form_errors(fields, upload_rules, limits)
+                if errors:
+                    return jsonify(errors), status_code
+
+                return await f(*args, **kwargs)
+            return async_decorated_function
+
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            errors, status_code = _form_errors(fields, upload_rules, limits)
             if errors:
-                return jsonify(errors), 400
+                return jsonify(errors), status_code
 
             return f(*args, **kwargs)
         return decorated_function
     return decorator
 
-def validate_db(model_class, Session, **validators):
+def _with_targets(wrapper, targets):
+    # Records what prefork.warmup() should prepare for this view; wraps()
+    # already copied the targets of any decorator stacked below.
+    wrapper.validation_targets = getattr(wrapper, 'validation_targets', ()) + targets
+    return wrapper
+
+def _db_module():
+    try:
+        return importlib.import_module('flask_validators.models.validate_db')
+    except ImportError as error:
+        raise ImportError('validate_db requires SQLAlchemy: pip install flask_validators[db]') from error
+
+def _llm_module():
+    try:
+        return importlib.import_module('flask_validators.models.validate_llm')
+    except ImportError as error:
+        raise ImportError('validate_llm requires langid: pip install flask_validators[llm]') from error
+
+def _validate_languages(values, desired_language):
+    return _llm_module().validate_languages(values, desired_language)
+
+def _open_session(Session):
+    # A sessionmaker gives us a fresh session that we own and must close. Any
+    # other callable (a scoped_session, or a provider such as
+    # ``lambda: g.db_session``) hands back the request's own session, which
+    # stays open for the view and is closed by whoever created it.
+    from sqlalchemy.orm import sessionmaker
+
+    factories = (sessionmaker,)
+    # An async_sessionmaker exists only once its module has been imported,
+    # and importing it needs greenlet, which sync-only installs may lack.
+    asyncio_module = sys.modules.get('sqlalchemy.ext.asyncio')
+    if asyncio_module is not None:
+        factories += (asyncio_module.async_sessionmaker,)
+    if isinstance(Session, factories):
+        return Session(), True
+    return Session(), False
+
+def _query_in_own_session(model_class, Session, checks):
+    session = Session()
+    try:
+        with session.no_autoflush:
+            return _db_module().run_query_checks(model_class, session, checks)
+    finally:
+        session.close()
+
+def _run_query_checks_parallel(model_class, Session, query_checks):
+    # One query per field, each on its own pooled connection, so the request
+    # waits for the slowest field rather than for one large query.
+    groups = {}
+    for position, check in enumerate(query_checks):
+        groups.setdefault(check[2]['field'], []).append(position)
+
+    calls = [(_query_in_own_session, (model_class, Session, [query_checks[p] for p in positions]))
+             for positions in groups.values()]
+    query_results = [None] * len(query_checks)
+    for positions, results in zip(groups.values(), run_parallel(calls)):
+        for position, result in zip(positions, results):
+            query_results[position] = result
+    return query_results
+
+def _skip_failed(fields, failed_fields, fail_fast):
+    # Positions of the expensive checks fail-fast mode can still run.
+    if not fail_fast or not failed_fields:
+        return list(range(len(fields)))
+    if fail_fast == 'request':
+        return []
+    return [position for position, field in enumerate(fields) if field not in failed_fields]
+
+def _run_db_checks(model_class, session, validators, data, Session=None, parallel=False, fail_fast=False):
+    from sqlalchemy.orm import sessionmaker
+
+    db = _db_module()
+    # Run the in-memory checks right away and collect the query-backed
+    # ones so they can share a single round trip.
+    results = []
+    query_checks = []
+    query_positions = []
+    for field, validator_func_names in validators.items():
+        value = data.get(field, None)  # Get the value, which may be None
+        # ensure validator_func_names is a list
+        if not isinstance(validator_func_names, list):
+            validator_func_names = [validator_func_names]
+        for validator_func_name in validator_func_names:
+            validator_func = getattr(db, validator_func_name) if validator_func_name in DB_VALIDATORS else None
+            if not validator_func:
+                continue
+            if validator_func_name in db.QUERY_CHECKS:
+                query_checks.append((validator_func_name, value, {'field': field}))
+                query_positions.append(len(results))
+                results.append((field, None))
+            else:
+                if instrumentation.active:
+                    result = instrumentation.call('validate_db', field, validator_func_name, validator_func,
+                                                  model_class, session, value, {'field': field})
+                else:
+                    result = validator_func(model_class, session, value, {'field': field})
+                results.append((field, result))
+
+    if query_checks and fail_fast:
+        failed_fields = {field for field, result in results if result is not None and not result[0]}
+        keep = _skip_failed([check[2]['field'] for check in query_checks], failed_fields, fail_fast)
+        for position in set(range(len(query_checks))) - set(keep):
+            results[query_positions[position]] = (results[query_positions[position]][0], (True, None))
+        query_checks = [query_checks[position] for position in keep]
+        query_positions = [query_positions[position] for position in keep]
+
+    if query_checks:
+        fields = {check[2]['field'] for check in query_checks}
+        # Parallel mode needs a factory for extra sessions; a borrowed session
+        # cannot be shared between threads.
+        if parallel and len(fields) > 1 and isinstance(Session, sessionmaker):
+            if instrumentation.active:
+                query_results = instrumentation.call_many(
+                    'validate_db', ','.join(sorted(fields)), 'run_query_checks',
+                    _run_query_checks_parallel, model_class, Session, query_checks)
+            else:
+                query_results = _run_query_checks_parallel(model_class, Session, query_checks)
+        else:
+            # Validation only reads, so never let it flush pending changes the
+            # view may have staged on a shared session.
+            with session.no_autoflush:
+                if instrumentation.active:
+                    query_results = instrumentation.call_many(
+                        'validate_db', ','.join(sorted(fields)), 'run_query_checks',
+                        db.run_query_checks, model_class, session, query_checks)
+                else:
+                    query_results = db.run_query_checks(model_class, session, query_checks)
+        for position, result in zip(query_positions, query_results):
+            results[position] = (results[position][0], result)
+
+    errors = {}
+    for field, (is_valid, error_message) in results:
+        # In fail-fast mode the first (cheapest) failure is the one reported.
+        if not is_valid and not (fail_fast and field in errors):
+            errors[field] = error_message
+    return errors
+
+def _admitted_data(limits):
+    # (data, None), or (None, error response) for a request over its limits.
+    try:
+        return request_data(limits), None
+    except LimitExceeded as error:
+        return None, (jsonify(error.errors), error.status_code)
+    except RequestEntityTooLarge:
+        return None, (jsonify({'error': 'Request body is too large.'}), 413)
+
+def _accept(fields, data):
+    # Checked values the view can read from validated_data(); a value already
+    # coerced by validate_form is kept.
+    accepted = validated_data()
+    for field in fields:
+        if field in data:
+            accepted.setdefault(field, data[field])
+
+def _derive_validators(model_class, validators):
+    # The declared checks plus the query-backed ones the model implies.
+    # check_column is left out; it runs before a session is opened.
+    db = _db_module()
+    derived = {}
+    for field, validator_func_names in validators.items():
+        if not isinstance(validator_func_names, list):
+            validator_func_names = [validator_func_names]
+        extra = [name for name in db.derived_checks(model_class, field, validator_func_names)
+                 if name != 'check_column' and name not in validator_func_names]
+        derived[field] = validator_func_names + extra
+    return derived
+
+def _column_errors(model_class, validators, data):
+    # What the model declares about each column, checked in memory, so a
+    # payload that could never be inserted is rejected without a query.
+    check_column = _db_module().check_column
+    errors = {}
+    for field in validators:
+        if instrumentation.active:
+            is_valid, error_message = instrumentation.call('validate_db', field, 'check_column', check_column,
+                                                           model_class, None, data.get(field), {'field': field})
+        else:
+            is_valid, error_message = check_column(model_class, None, data.get(field), {'field': field})
+        if not is_valid:
+            errors[field] = error_message
+    return errors
+
+def validate_db(model_class, Session, parallel=False, fail_fast=False, derive=False, limits=None, **validators):
+    limits = Limits.from_arg(limits)
+    derived = []
+
+    def checks_for(data):
+        # With ``derive`` the column checks run first and the model's unique
+        # constraints join the query; the mapper is read on first request,
+        # once every model is configured.
+        if not derive:
+            return None, validators
+        if not derived:
+            derived.append(_derive_validators(model_class, validators))
+        return _column_errors(model_class, validators, data), derived[0]
+
     def decorator(f):
+        if inspect.iscoroutinefunction(f):
+            @wraps(f)
+            async def async_decorated_function(*args, **kwargs):
+                data, rejected = _admitted_data(limits)
+                if rejected:
+                    return rejected
+                errors, checks = checks_for(data)
+                if errors:
+                    return jsonify(errors), 400
+
+                from sqlalchemy.ext.asyncio import AsyncSession
+
+                session, owns_session = _open_session(Session)
+                is_async_session = isinstance(session, AsyncSession)
+                try:
+                    g.validate_db_session = session
+
+                    if is_async_session:
+                        # run_sync drives the same checks on the AsyncSession's
+                        # connection without blocking the event loop.
+                        errors = await session.run_sync(
+                            lambda sync_session: _run_db_checks(model_class, sync_session, checks, data, fail_fast=fail_fast))
+                    else:
+                        errors = await asyncio.to_thread(_run_db_checks, model_class, session, checks, data, Session, parallel, fail_fast)
+                    if errors:
+                        return jsonify(errors), 400
+
+                    _accept(validators, data)
+                    return await f(*args, **kwargs)
+                finally:
+                    if owns_session:
+                        if is_async_session:
+                            await session.close()
+                        else:
+                            session.close()
+            return _with_targets(async_decorated_function, (('model', model_class),))
+
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            session = Session()
-            if request.is_json:
-                data = request.get_json()
-            else:
-                data = request.form.to_dict()
-
-            errors = {}
-
-            for field, validator_func_names in validators.items():
-                value = data.get(field, None)  # Get the value, which may be None
-                # ensure validator_func_names is a list
-                if not isinstance(validator_func_names, list):
-                    validator_func_names = [validator_func_names]
-                for validator_func_name in validator_func_names:
-                    validator_func = globals().get(validator_func_name)
-                    if validator_func:
-                        is_valid, error_message = validator_func(model_class, session, value, {'field': field})
-                        if not is_valid:
-                            errors[field] = error_message
-
+            data, rejected = _admitted_data(limits)
+            if rejected:
+                return rejected
+            errors, checks = checks_for(data)
             if errors:
                 return jsonify(errors), 400
 
-            return f(*args, **kwargs)
-        return decorated_function
+            session, owns_session = _open_session(Session)
+            try:
+                # Expose the session so the view can reuse it, and with it
+                # the connection validation already checked out.
+                g.validate_db_session = session
+
+                errors = _run_db_checks(model_class, session, checks, data, Session, parallel, fail_fast)
+                if errors:
+                    return jsonify(errors), 400
+
+                _accept(validators, data)
+                return f(*args, **kwargs)
+            finally:
+                if owns_session:
+                    session.close()
+        return _with_targets(decorated_function, (('model', model_class),))
     return decorator
 
-def validate_llm(**validators):
+def _collect_llm_checks(validators, payload):
+    errors = {}
+    # Language checks are collected for every field and scored together
+    # in one batch once the loop is done.
+    language_fields = []
+    language_values = []
+
+    for field, validation_params in validators.items():
+        if field not in payload:
+            if validation_params[0] == 'validate_language':
+                if field == 'lang':
+                    continue
+                else:
+                    errors[field] = f'Missing {field} field.'
+            continue
+
+        value = payload[field]
+        if isinstance(validation_params, list):
+            for validator_func_name in validation_params:
+                validator_func = getattr(_llm_module(), validator_func_name) if validator_func_name in LLM_VALIDATORS else None
+                if validator_func:
+                    if validator_func_name == 'validate_language':
+                        values = value if isinstance(value, list) else [value]
+                        language_fields.extend([field] * len(values))
+                        language_values.extend(values)
+                        continue
+
+                    if instrumentation.active:
+                        is_valid, error_message = instrumentation.call('validate_llm', field, validator_func_name, validator_func, value)
+                    else:
+                        is_valid, error_message = validator_func(value)
+                    if not is_valid:
+                        errors[field] = error_message
+                        break  # Exit the inner loop when an error occurs
+                else:
+                    errors[field] = f'Invalid validator function: {validator_func_name}'
+                    break  # Exit the inner loop when an error occurs
+        else:
+            errors[field] = 'Invalid validation parameters.'
+
+    return errors, language_fields, language_values
+
+def _classify_instrumented(classify, language_fields, language_values, lang):
+    return instrumentation.call_many('validate_llm', ','.join(sorted(set(language_fields))), 'validate_language',
+                                     classify, language_values, lang)
+
+def _merge_language_results(errors, language_fields, results):
+    for field, (is_valid, error_message) in zip(language_fields, results):
+        if not is_valid and field not in errors:
+            errors[field] = error_message
+    return errors
+
+def _skip_failed_languages(errors, language_fields, language_values, fail_fast):
+    keep = _skip_failed(language_fields, set(errors), fail_fast)
+    return [language_fields[p] for p in keep], [language_values[p] for p in keep]
+
+def validate_llm(fail_fast=False, limits=None, **validators):
+    limits = Limits.from_arg(limits)
+    lang = validators.get('lang', 'en')  # Retrieve lang parameter from validators dictionary
+    classify = _validate_languages
+    checked_fields = [field for field in validators if field != 'lang']
+
     def decorator(f):
+        if inspect.iscoroutinefunction(f):
+            @wraps(f)
+            async def async_decorated_function(*args, **kwargs):
+                payload, rejected = _admitted_data(limits)
+                if rejected:
+                    return rejected
+                errors, language_fields, language_values = _collect_llm_checks(validators, payload)
+                language_fields, language_values = _skip_failed_languages(errors, language_fields, language_values, fail_fast)
+
+                if language_values:
+                    # Classification is CPU-bound; keep it off the event loop.
+                    if instrumentation.active:
+                        task = partial(_classify_instrumented, classify, language_fields, language_values, lang)
+                    else:
+                        task = partial(classify, language_values, desired_language=lang)
+                    results = await asyncio.get_running_loop().run_in_executor(None, task)
+                    _merge_language_results(errors, language_fields, results)
+
+                if errors:
+                    return jsonify(errors), 400
+
+                _accept(checked_fields, payload)
+                return await f(*args, **kwargs)
+            return _with_targets(async_decorated_function, (('language', None),))
+
         @wraps(f)
         def decorated_function(*args, **kwargs):
-            errors = {}
-            lang = None  # Initialize lang as None
-
-            for field, validation_params in validators.items():
-                if field not in request.json:
-                    if validation_params[0] == 'validate_language':
-                        if field == 'lang':
-                            continue
-                        else:
-                            errors[field] = f'Missing {field} field.'
-                    continue
+            payload, rejected = _admitted_data(limits)
+            if rejected:
+                return rejected
+            errors, language_fields, language_values = _collect_llm_checks(validators, payload)
+            language_fields, language_values = _skip_failed_languages(errors, language_fields, language_values, fail_fast)
 
-                value = request.json[field]
-                if isinstance(validation_params, list):
-                    for validator_func_name in validation_params:
-                        validator_func = globals().get(validator_func_name)
-                        if validator_func:
-                            if validator_func_name == 'validate_language':
-                                lang = validators.get('lang', 'en')  # Retrieve lang parameter from validators dictionary
-                                is_valid, error_message = validator_func(value, desired_language=lang)
-                            else:
-                                is_valid, error_message = validator_func(value)
-
-                            if not is_valid:
-                                errors[field] = error_message
-                                break  # Exit the inner loop when an error occurs
-                        else:
-                            errors[field] = f'Invalid validator function: {validator_func_name}'
-                            break  # Exit the inner loop when an error occurs
+            if language_values:
+                if instrumentation.active:
+                    results = _classify_instrumented(classify, language_fields, language_values, lang)
                 else:
-                    errors[field] = 'Invalid validation parameters.'
+                    results = classify(language_values, desired_language=lang)
+                _merge_language_results(errors, language_fields, results)
 
             if errors:
                 return jsonify(errors), 400
 
+            _accept(checked_fields, payload)
             return f(*args, **kwargs)
 
-        return decorated_function
+        return _with_targets(decorated_function, (('language', None),))
+
+    return decorator
+
+def validate_stream(schema, format=None, max_errors=None, max_reported_errors=100):
+    # A schema mixing rule dicts and Field objects fails here, not per request.
+    is_rule_schema(schema)
+
+    def open_stream():
+        stream_format = format or ('csv' if request.mimetype == 'text/csv' else 'ndjson')
+        # The view receives the valid records as they are read from the
+        # body; nothing is buffered beyond the current line.
+        return RecordStream(schema, request.stream, stream_format,
+                            max_errors=max_errors,
+                            max_reported_errors=max_reported_errors)
 
-    return decorator
\ No newline at end of file
+    def decorator(f):
+        if inspect.iscoroutinefunction(f):
+            @wraps(f)
+            async def async_decorated_function(*args, **kwargs):
+                kwargs['records'] = open_stream()
+                try:
+                    return await f(*args, **kwargs)
+                except StreamValidationError as error:
+                    return ErrorHandler.handle_validation_error(error)
+            return _with_targets(async_decorated_function, (('schema', schema),))
+
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            kwargs['records'] = open_stream()
+            try:
+                return f(*args, **kwargs)
+            except StreamValidationError as error:
+                return ErrorHandler.handle_validation_error(error)
+        return _with_targets(decorated_function, (('schema', schema),))
+    return decorator
@@ -0,0 +1,185 @@
+import bisect
+import logging
+import threading
+import time
+
+logger = logging.getLogger('flask_validators')
+
+# Histogram bucket upper bounds, in seconds.
+DEFAULT_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Checked by every instrumented call site before doing any extra work, so
+# validation costs nothing more than this flag lookup while no hook is set.
+active = False
+
+_hooks = ()
+_hooks_lock = threading.Lock()
+_local = threading.local()
+
+
+class ValidatorEvent:
+    __slots__ = ('source', 'field', 'validator', 'duration', 'is_valid', 'error_message', 'query_count')
+
+    def __init__(self, source, field, validator, duration, is_valid, error_message, query_count=0):
+        self.source = source
+        self.field = field
+        self.validator = validator
+        self.duration = duration
+        self.is_valid = is_valid
+        self.error_message = error_message
+        self.query_count = query_count
+
+
+class Hook:
+    def before(self, source, field, validator):
+        pass
+
+    def after(self, event):
+        pass
+
+
+def add_hook(hook):
+    global _hooks, active
+    with _hooks_lock:
+        _hooks = _hooks + (hook,)
+        active = True
+    return hook
+
+
+def remove_hook(hook):
+    global _hooks, active
+    with _hooks_lock:
+        _hooks = tuple(h for h in _hooks if h is not hook)
+        active = bool(_hooks)
+
+
+def count_query(count=1):
+    if active:
+        _local.queries = getattr(_local, 'queries', 0) + count
+
+
+def _run(source, field, validator, func, args, outcome):
+    hooks = _hooks
+    for hook in hooks:
+        hook.before(source, field, validator)
+
+    queries_before = getattr(_local, 'queries', 0)
+    start = time.perf_counter()
+    result = func(*args)
+    duration = time.perf_counter() - start
+    query_count = getattr(_local, 'queries', 0) - queries_before
+
+    is_valid, error_message = outcome(result)
+    event = ValidatorEvent(source, field, validator, duration, bool(is_valid), error_message, query_count)
+    for hook in hooks:
+        hook.after(event)
+    return result
+
+
+def _first_failure(results):
+    for is_valid, error_message in results:
+        if not is_valid:
+            return False, error_message
+    return True, None
+
+
+def call(source, field, validator, func, *args):
+    # Runs one validator under the registered hooks. func must return the
+    # usual (is_valid, error_message) pair; it is returned unchanged.
+    return _run(source, field, validator, func, args, tuple)
+
+
+def call_many(source, field, validator, func, *args):
+    # Same as call() for batched checks that return a list of pairs; the
+    # batch is reported as one event that fails if any of its checks failed.
+    return _run(source, field, validator, func, args, _first_failure)
+
+
+class _Histogram:
+    __slots__ = ('counts', 'total', 'count', 'failures', 'queries')
+
+    def __init__(self, buckets):
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.failures = 0
+        self.queries = 0
+
+
+class MetricsCollector(Hook):
+    # Built-in aggregator: per (source, field, validator) latency histograms,
+    # failure and query counters, Prometheus text export, and a warning log
+    # for every call slower than ``slow_threshold`` seconds.
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, slow_threshold=None, prefix='flask_validators'):
+        self.buckets = tuple(buckets)
+        self.slow_threshold = slow_threshold
+        self.prefix = prefix
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def after(self, event):
+        key = (event.source, event.field, event.validator)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self.buckets)
+            histogram.counts[bisect.bisect_left(self.buckets, event.duration)] += 1
+            histogram.total += event.duration
+            histogram.count += 1
+            histogram.queries += event.query_count
+            if not event.is_valid:
+                histogram.failures += 1
+
+        if self.slow_threshold is not None and event.duration >= self.slow_threshold:
+            logger.warning('Slow validator %s on field %s (%s): %.1f ms, %d queries',
+                           event.validator, event.field, event.source, event.duration * 1000, event.query_count)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                key: {
+                    'count': histogram.count,
+                    'failures': histogram.failures,
+                    'queries': histogram.queries,
+                    'total_seconds': histogram.total,
+                    'buckets': list(zip(self.buckets + (float('inf'),), histogram.counts)),
+                }
+                for key, histogram in self._histograms.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def prometheus_text(self):
+        name = f'{self.prefix}_validator_duration_seconds'
+        lines = [
+            f'# HELP {name} Time spent in each validator.',
+            f'# TYPE {name} histogram',
+        ]
+        failures = []
+        queries = []
+        for (source, field, validator), stats in sorted(self.snapshot().items(), key=lambda item: tuple(map(str, item[0]))):
+            labels = f'source="{_escape(source)}",field="{_escape(field)}",validator="{_escape(validator)}"'
+            cumulative = 0
+            for bound, count in stats['buckets']:
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{labels}}} {stats["total_seconds"]!r}')
+            lines.append(f'{name}_count{{{labels}}} {stats["count"]}')
+            failures.append(f'{self.prefix}_validator_failures_total{{{labels}}} {stats["failures"]}')
+            queries.append(f'{self.prefix}_validator_queries_total{{{labels}}} {stats["queries"]}')
+
+        lines.append(f'# HELP {self.prefix}_validator_failures_total Validations that failed.')
+        lines.append(f'# TYPE {self.prefix}_validator_failures_total counter')
+        lines.extend(failures)
+        lines.append(f'# HELP {self.prefix}_validator_queries_total Database queries issued by validators.')
+        lines.append(f'# TYPE {self.prefix}_validator_queries_total counter')
+        lines.extend(queries)
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
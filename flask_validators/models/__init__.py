@@ -1,6 +1,38 @@
+import importlib
+
 from .fields import Field
 from .schema import Schema
-from .validate_db  import check_unique, check_null, check_existence, check_range, check_type, check_enum, check_length
-from .validate_llm import validate_language
+from .cost import COST_PURE, COST_CPU, COST_IO, set_validator_cost
+
+# The database and language helpers pull in SQLAlchemy and langid, which are
+# optional extras; they are imported on first attribute access instead.
+_LAZY_ATTRIBUTES = {
+    "check_unique": ".validate_db",
+    "check_null": ".validate_db",
+    "check_existence": ".validate_db",
+    "check_range": ".validate_db",
+    "check_type": ".validate_db",
+    "check_enum": ".validate_db",
+    "check_length": ".validate_db",
+    "check_column": ".validate_db",
+    "model_metadata": ".metadata",
+    "enable_membership_index": ".membership",
+    "disable_membership_index": ".membership",
+    "validate_language": ".validate_llm",
+    "validate_languages": ".validate_llm",
+    "load_identifier": ".validate_llm",
+    "set_languages": ".validate_llm",
+    "detect_language": ".validate_llm",
+    "set_long_text": ".validate_llm",
+}
+
+__all__ = ["Field", "Schema", "check_unique", "check_null", "check_existence", "check_range", "check_type", "check_enum", "check_length", "check_column", "model_metadata", "COST_PURE", "COST_CPU", "COST_IO", "set_validator_cost", "enable_membership_index", "disable_membership_index", "validate_language", "validate_languages", "load_identifier", "set_languages", "detect_language", "set_long_text"]
+
 
-__all__ = ["Field", "Schema", "check_unique", "check_null", "check_existence", "check_range", "check_type", "check_enum", "check_length", "validate_language"]
\ No newline at end of file
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,31 @@
+# Rough cost classes for validators, cheapest first. Fail-fast mode runs
+# checks in this order and skips the expensive ones once a cheap one fails.
+COST_PURE = 'pure'
+COST_CPU = 'cpu'
+COST_IO = 'io'
+
+COST_ORDER = {
+    COST_PURE: 0,
+    COST_CPU: 1,
+    COST_IO: 2,
+}
+
+VALIDATOR_COSTS = {
+    'check_unique': COST_IO,
+    'check_existence': COST_IO,
+    'validate_language': COST_CPU,
+}
+
+
+def validator_cost(name):
+    return VALIDATOR_COSTS.get(name, COST_PURE)
+
+
+def set_validator_cost(name, cost):
+    if cost not in COST_ORDER:
+        raise ValueError(f'Unknown cost class: {cost}')
+    VALIDATOR_COSTS[name] = cost
+
+
+def cost_rank(cost):
+    return COST_ORDER[cost]
@@ -1,64 +1,362 @@
 import re
 import json
+import inspect
 
+from functools import lru_cache
 from urllib.parse import urlparse
 from datetime import datetime
 
+from .cost import cost_rank, validator_cost
+from .files import expected_content_types, file_extension, file_info
+from .nested import first_error
+from flask_validators import instrumentation
+
+EMAIL_RE = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w+$')
+SPECIAL_CHAR_RE = re.compile(r'\W')
+PHONE_RE = re.compile(r'^\+?1?\d{9,15}$')
+ZIPCODE_RE = re.compile(r'^\d{5}(-\d{4})?$')  # US zipcode format
+CREDIT_CARD_RE = re.compile(r'^(\d{4}[-\s]?){3}\d{4}$')
+SSN_RE = re.compile(r'^\d{3}-\d{2}-\d{4}$')
+IP_ADDRESS_RE = re.compile(r'^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$')  # naive IPv4 check
+HEX_COLOR_RE = re.compile(r'^#([A-Fa-f0-9]{6}|[A-Fa-f0-9]{3})$')
+LATITUDE_RE = re.compile(r'^[-+]?([1-8]?\d(\.\d+)?|90(\.0+)?)$')
+LONGITUDE_RE = re.compile(r'^[-+]?(180(\.0+)?|((1[0-7]\d)|([1-9]?\d))(\.\d+)?)$')
+
+VALIDATOR_ALIASES = {
+    'min_age': 'age',
+    'max_age': 'age',
+}
+
+# Validators that are a single anchored regex match. Columns of values are
+# checked against these directly instead of going through the method.
+REGEX_VALIDATORS = {
+    'email': (EMAIL_RE, 'Invalid email address.'),
+    'phone': (PHONE_RE, 'Invalid phone number.'),
+    'zipcode': (ZIPCODE_RE, 'Invalid zipcode.'),
+    'credit_card': (CREDIT_CARD_RE, 'Invalid credit card number.'),
+    'ssn': (SSN_RE, 'Invalid social security number.'),
+    'ip_address': (IP_ADDRESS_RE, 'Invalid IP address.'),
+    'hex_color': (HEX_COLOR_RE, 'Invalid hexadecimal color code.'),
+    'latitude': (LATITUDE_RE, 'Invalid latitude.'),
+    'longitude': (LONGITUDE_RE, 'Invalid longitude.'),
+}
+
+TYPE_COERCIONS = {
+    'string': str,
+    'integer': int,
+    'float': float,
+    'boolean': bool,
+}
+
+
+def _bind(validator_func, args, kwargs):
+    def bound(value):
+        return validator_func(value, *args, **kwargs)
+    return bound
+
+
+# Column checks return [(index, message)] for the failing values only, so
+# a step where everything passes costs nothing beyond the check itself.
+
+def _regex_column(pattern, error_message):
+    match = pattern.match
+    def check_column(values, contexts):
+        # Columns repeat values a lot (zipcodes, domains...), so each distinct
+        # value is matched only once.
+        invalid = {value for value in set(values) if match(value) is None}
+        if not invalid:
+            return ()
+        return [(index, error_message) for index, value in enumerate(values) if value in invalid]
+    return check_column
+
+
+def _row_column(validator_func, context_aware):
+    def check_column(values, contexts):
+        results = map(validator_func, values, contexts) if context_aware else map(validator_func, values)
+        return [(index, error_message) for index, (is_valid, error_message) in enumerate(results) if not is_valid]
+    return check_column
+
+
+@lru_cache(maxsize=None)
+def _accepts_context(func):
+    return 'context' in inspect.signature(func).parameters
+
+
+def takes_context(validator_func):
+    # Cross-field validators declare a ``context`` parameter and receive the
+    # whole record being validated through it.
+    return _accepts_context(getattr(validator_func, '__func__', validator_func))
+
+
+def _bind_context(validator_func, args, kwargs):
+    def bound(value, context):
+        return validator_func(value, *args, context=context, **kwargs)
+    return bound
+
+
 class Field:
-    def __init__(self, required=False, type=None, validators=None):
-        self.required = required
-        self.type = type
-        self.validators = validators or []
+    # Fields are immutable once built, so one definition can be shared by
+    # every thread and request. Per-request data such as the other values of
+    # the record reaches validators through the ``context`` argument.
+    #
+    # ``type='object'`` with ``schema`` (a Schema or a dict of Fields) and
+    # ``type='list'`` with ``items`` (the Field every element must match)
+    # nest; such fields are validated by the iterative engine in nested.py.
+    __slots__ = ('required', 'type', 'validators', 'name', 'fields', 'items', 'min_items', 'max_items', 'nested',
+                 '_coerce', '_plan', '_plan_names', '_column_plan', '_parse_step')
+
+    def __init__(self, required=False, type=None, validators=None, name=None, schema=None, items=None,
+                 min_items=None, max_items=None):
+        if type is None:
+            type = 'object' if schema is not None else 'list' if items is not None else None
+        if type == 'object' and schema is None:
+            raise ValueError("An 'object' field needs a schema.")
+        fields = getattr(schema, 'fields', schema)
+        if fields is not None:
+            fields = dict(fields)
+            for field_name, field in fields.items():
+                field.bind_name(field_name)
+
+        set_attribute = object.__setattr__
+        set_attribute(self, 'required', required)
+        set_attribute(self, 'type', type)
+        set_attribute(self, 'validators', tuple(validators or ()))
+        set_attribute(self, 'name', name)  # Used in instrumentation events
+        set_attribute(self, 'fields', fields)
+        set_attribute(self, 'items', items)
+        set_attribute(self, 'min_items', min_items)
+        set_attribute(self, 'max_items', max_items)
+        set_attribute(self, 'nested', type in ('object', 'list'))
+        self.compile()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'Field is immutable; cannot set {name!r}')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'Field is immutable; cannot delete {name!r}')
+
+    def bind_name(self, name):
+        # The one permitted change: a Schema names its unnamed fields when
+        # they are registered, before any request can see them.
+        if self.name is None:
+            object.__setattr__(self, 'name', name)
+
+    def compile(self):
+        # Resolve every validator once so validate() only walks a tuple of
+        # ready-to-call (callable, message, takes_context) entries. Cheap
+        # validators go first, so validate() returns before reaching an
+        # expensive one.
+        plan = []
+        plan_names = []
+        column_plan = []
+        for validator in sorted(self.validators, key=self._validator_rank):
+            validator_name = validator['name']
+            validator_name = VALIDATOR_ALIASES.get(validator_name, validator_name)
+
+            validator_func = getattr(self, f'validate_{validator_name}', None)
+            if not validator_func:
+                raise ValueError(f'Unknown validator: {validator["name"]}')
+
+            validator_args = validator.get('args', ())
+            validator_kwargs = validator.get('kwargs', {})
+            context_aware = takes_context(validator_func)
+            if context_aware:
+                validator_func = _bind_context(validator_func, validator_args, validator_kwargs)
+            elif validator_args or validator_kwargs:
+                validator_func = _bind(validator_func, validator_args, validator_kwargs)
+
+            plan.append((validator_func, validator.get('message'), context_aware))
+            plan_names.append(validator_name)
+
+            regex = REGEX_VALIDATORS.get(validator_name)
+            overridden = getattr(type(self), f'validate_{validator_name}') is not getattr(Field, f'validate_{validator_name}', None)
+            if regex and not (validator_args or validator_kwargs or overridden):
+                column_plan.append((_regex_column(*regex), validator.get('message'), False))
+            else:
+                column_plan.append((_row_column(validator_func, context_aware), validator.get('message'), context_aware))
+
+        # clean() keeps the document parsed by the json step instead of
+        # parsing it a second time, unless a subclass changed that validator.
+        parse_step = None
+        if 'json' in plan_names and type(self).validate_json is Field.validate_json:
+            parse_step = plan_names.index('json')
+
+        set_attribute = object.__setattr__
+        set_attribute(self, '_coerce', TYPE_COERCIONS.get(self.type))
+        set_attribute(self, '_plan', tuple(plan))
+        set_attribute(self, '_plan_names', tuple(plan_names))
+        set_attribute(self, '_column_plan', tuple(column_plan))
+        set_attribute(self, '_parse_step', parse_step)
+
+    @staticmethod
+    def _validator_rank(validator):
+        validator_name = VALIDATOR_ALIASES.get(validator['name'], validator['name'])
+        return cost_rank(validator.get('cost') or validator_cost(f'validate_{validator_name}'))
+
+    def validate(self, value, context=None):
+        if self.nested:
+            return first_error(self, value, context)
 
-    def validate(self, value):
         if self.required and value is None:
             return False, 'This field is required.'
 
-        if self.type:
+        if self._coerce is not None:
             try:
-                if self.type == 'string':
-                    value = str(value)
-                elif self.type == 'integer':
-                    value = int(value)
-                elif self.type == 'float':
-                    value = float(value)
-                elif self.type == 'boolean':
-                    value = bool(value)
+                value = self._coerce(value)
             except ValueError:
                 return False, f'Expected a {self.type}.'
 
             # Add more type validations as needed
 
-        for validator in self.validators:
-            validator_name = validator['name']
-            if validator_name == 'min_age':
-                validator_name = 'age'
-            elif validator_name == 'max_age':
-                validator_name = 'age'
-            elif validator_name == 'email':
-                validator_name = 'email'
+        if instrumentation.active:
+            return self._validate_instrumented(value, context)
 
-            validator_func = getattr(self, f'validate_{validator_name}', None)
-            if not validator_func:
-                continue
+        for validator_func, custom_message, context_aware in self._plan:
+            if context_aware:
+                is_valid, error_message = validator_func(value, context)
+            else:
+                is_valid, error_message = validator_func(value)
+            if not is_valid:
+                return False, custom_message if custom_message else error_message
 
-            validator_args = validator.get('args', ())
-            validator_kwargs = validator.get('kwargs', {})
+        return True, None
+
+    def run_validators(self, value, context=None):
+        # Only the validators of the plan, without the required and type
+        # steps; the nested engine checks containers itself and uses this.
+        if instrumentation.active:
+            return self._validate_instrumented(value, context)
+
+        for validator_func, custom_message, context_aware in self._plan:
+            if context_aware:
+                is_valid, error_message = validator_func(value, context)
+            else:
+                is_valid, error_message = validator_func(value)
+            if not is_valid:
+                return False, custom_message if custom_message else error_message
+
+        return True, None
+
+    def clean(self, value, context=None):
+        # Same checks as validate(), but also returns the value the view should
+        # work with: coerced to the field's type, or the parsed document for a
+        # json field. Returns (is_valid, error_message, value).
+        if self.nested:
+            is_valid, error_message = first_error(self, value, context)
+            return is_valid, error_message, value if is_valid else None
+
+        if self.required and value is None:
+            return False, 'This field is required.', None
 
-            if validator_name == 'age':
-                min_age, max_age = validator_args
-                is_valid, error_message = validator_func(value, min_age, max_age, **validator_kwargs)
+        if self._coerce is not None:
+            try:
+                value = self._coerce(value)
+            except ValueError:
+                return False, f'Expected a {self.type}.', None
+
+        if instrumentation.active:
+            is_valid, error_message = self._validate_instrumented(value, context)
+            if is_valid and self._parse_step is not None:
+                value = self.parse_json(value)[2]
+            return is_valid, error_message, value
+
+        cleaned = value
+        for step, (validator_func, custom_message, context_aware) in enumerate(self._plan):
+            if step == self._parse_step:
+                is_valid, error_message, cleaned = self.parse_json(value)
+            elif context_aware:
+                is_valid, error_message = validator_func(value, context)
             else:
-                is_valid, error_message = validator_func(value, *validator_args, **validator_kwargs)
+                is_valid, error_message = validator_func(value)
+            if not is_valid:
+                return False, custom_message if custom_message else error_message, None
 
+        return True, None, cleaned
+
+    def _validate_instrumented(self, value, context):
+        for (validator_func, custom_message, context_aware), validator_name in zip(self._plan, self._plan_names):
+            args = (value, context) if context_aware else (value,)
+            is_valid, error_message = instrumentation.call('field', self.name, validator_name, validator_func, *args)
             if not is_valid:
-                custom_message = validator.get('message')
                 return False, custom_message if custom_message else error_message
 
         return True, None
 
+    def validate_column(self, values, contexts=None):
+        # Column-oriented counterpart of validate(): runs each step of the plan
+        # over every still-valid value at once. ``contexts`` holds the record
+        # each value came from, for cross-field validators. Returns
+        # {position: message} for the values that failed.
+        errors = {}
+        if contexts is None:
+            contexts = [None] * len(values)
+
+        if self.nested:
+            # Documents do not split into columns; each one is walked alone.
+            for position, (value, context) in enumerate(zip(values, contexts)):
+                is_valid, error_message = first_error(self, value, context)
+                if not is_valid:
+                    errors[position] = error_message
+            return errors
+
+        # ``column`` holds the values still being checked and ``positions``
+        # their index in ``values``; None while that is every value in order,
+        # so the lists are only rebuilt after a step rejected something.
+        column = values
+        positions = None
+        if self.required and None in values:
+            positions = []
+            for position, value in enumerate(values):
+                if value is None:
+                    errors[position] = 'This field is required.'
+                else:
+                    positions.append(position)
+            column = [values[position] for position in positions]
+
+        if self._coerce is not None:
+            coerce = self._coerce
+            try:
+                column = list(map(coerce, column))
+            except ValueError:
+                # Some value does not convert; find which, one at a time.
+                coerced = []
+                failures = []
+                for index, value in enumerate(column):
+                    try:
+                        coerced.append(coerce(value))
+                    except ValueError:
+                        failures.append((index, f'Expected a {self.type}.'))
+                        coerced.append(None)
+                positions, column = self._drop_failed(positions, coerced, failures, None, errors)
+
+        for check_column, custom_message, context_aware in self._column_plan:
+            if not column:
+                break
+            column_contexts = None
+            if context_aware:
+                column_contexts = contexts if positions is None else [contexts[position] for position in positions]
+            failures = check_column(column, column_contexts)
+            if failures:
+                positions, column = self._drop_failed(positions, column, failures, custom_message, errors)
+
+        return errors
+
+    @staticmethod
+    def _drop_failed(positions, column, failures, custom_message, errors):
+        # Records ``failures`` ([(index, message)] into ``column``) in
+        # ``errors`` and returns the positions and values that remain.
+        failed = set()
+        for index, error_message in failures:
+            errors[index if positions is None else positions[index]] = custom_message if custom_message else error_message
+            failed.add(index)
+        keep = [index for index in range(len(column)) if index not in failed]
+        column = [column[index] for index in keep]
+        if positions is not None:
+            keep = [positions[index] for index in keep]
+        return keep, column
+
     def validate_email(self, value):
-        if re.match(r'^[\w\.-]+@[\w\.-]+\.\w+$', value):
+        if EMAIL_RE.match(value):
             return True, None
         return False, 'Invalid email address.'
 
@@ -74,24 +372,27 @@ class Field:
 
     def validate_password(self, value, min_length=8, max_length=16, require_special_char=True):
         if isinstance(value, str) and min_length <= len(value) <= max_length:
-            if require_special_char and re.search(r'\W', value):
+            if require_special_char and SPECIAL_CHAR_RE.search(value):
                 return True, None
         return False, 'Invalid password.'
 
     def validate_json(self, value):
+        is_valid, error_message, _ = self.parse_json(value)
+        return is_valid, error_message
+
+    def parse_json(self, value):
         try:
-            json.loads(value)
-            return True, None
-        except json.JSONDecodeError:
-            return False, 'Invalid JSON.'
+            return True, None, json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return False, 'Invalid JSON.', None
 
     def validate_phone(self, value):
-        if re.match(r'^\+?1?\d{9,15}$', value):
+        if PHONE_RE.match(value):
             return True, None
         return False, 'Invalid phone number.'
 
     def validate_zipcode(self, value):
-        if re.match(r'^\d{5}(-\d{4})?$', value):  # US zipcode format
+        if ZIPCODE_RE.match(value):
             return True, None
         return False, 'Invalid zipcode.'
 
@@ -104,13 +405,13 @@ class Field:
 
     def validate_credit_card(self, value):
         # naive check for 16 digit number with optional hyphens or spaces
-        if re.match(r'^(\d{4}[-\s]?){3}\d{4}$', value):
+        if CREDIT_CARD_RE.match(value):
             return True, None
         return False, 'Invalid credit card number.'
 
     def validate_ssn(self, value):
         # naive check for US SSN (XXX-XX-XXXX)
-        if re.match(r'^\d{3}-\d{2}-\d{4}$', value):
+        if SSN_RE.match(value):
             return True, None
         return False, 'Invalid social security number.'
 
@@ -122,36 +423,43 @@ class Field:
             return False, 'Invalid URL.'
 
     def validate_ip_address(self, value):
-        if re.match(r'^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$', value):  # naive IPv4 check
+        if IP_ADDRESS_RE.match(value):
             return True, None
         return False, 'Invalid IP address.'
 
     def validate_hex_color(self, value):
-        if re.match(r'^#([A-Fa-f0-9]{6}|[A-Fa-f0-9]{3})$', value):
+        if HEX_COLOR_RE.match(value):
             return True, None
         return False, 'Invalid hexadecimal color code.'
 
     def validate_latitude(self, value):
-        if re.match(r'^[-+]?([1-8]?\d(\.\d+)?|90(\.0+)?)$', value):
+        if LATITUDE_RE.match(value):
             return True, None
         return False, 'Invalid latitude.'
 
     def validate_longitude(self, value):
-        if re.match(r'^[-+]?(180(\.0+)?|((1[0-7]\d)|([1-9]?\d))(\.\d+)?)$', value):
+        if LONGITUDE_RE.match(value):
             return True, None
         return False, 'Invalid longitude.'
 
-    def validate_file(self, value, allowed_extensions=None, max_size=None):
-        if allowed_extensions and value.filename.split('.')[-1] not in allowed_extensions:
+    def validate_file(self, value, allowed_extensions=None, max_size=None, allowed_types=None, hash=None):
+        # ``hash`` only matters while the upload streams; see controllers.upload.
+        if allowed_extensions and file_extension(value.filename) not in allowed_extensions:
             return False, 'Invalid file extension.'
-        
-        if max_size and value.content_length > max_size:
+
+        # The multipart Content-Length is usually missing, so measure the file.
+        size, content_type = file_info(value)
+        if max_size and size > max_size:
             return False, 'File size is too large.'
 
+        expected_types = expected_content_types(value.filename, allowed_types)
+        if expected_types is not None and content_type not in expected_types:
+            return False, 'File content does not match its type.'
+
         return True, None
 
-    def validate_confirm_password(self, value, password_field):
-        password = self.data.get(password_field)
+    def validate_confirm_password(self, value, password_field, context=None):
+        password = (context or {}).get(password_field)
         if password != value:
             return False, 'Passwords must match.'
         return True, None
\ No newline at end of file
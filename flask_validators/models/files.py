@@ -0,0 +1,170 @@
+import hashlib
+
+from tempfile import SpooledTemporaryFile
+
+# Bytes read from the start of a file to recognise its format.
+SNIFF_BYTES = 512
+# Uploads larger than this are spooled to disk instead of memory.
+SPOOL_MEMORY_BYTES = 500 * 1024
+
+# (checks, content type) where every (offset, signature) check must match;
+# the first matching entry wins.
+MAGIC_NUMBERS = (
+    (((0, b'\x89PNG\r\n\x1a\n'),), 'image/png'),
+    (((0, b'\xff\xd8\xff'),), 'image/jpeg'),
+    (((0, b'GIF87a'),), 'image/gif'),
+    (((0, b'GIF89a'),), 'image/gif'),
+    (((0, b'RIFF'), (8, b'WEBP')), 'image/webp'),
+    (((0, b'BM'),), 'image/bmp'),
+    (((0, b'II*\x00'),), 'image/tiff'),
+    (((0, b'MM\x00*'),), 'image/tiff'),
+    (((0, b'%PDF-'),), 'application/pdf'),
+    (((0, b'PK\x03\x04'),), 'application/zip'),
+    (((0, b'PK\x05\x06'),), 'application/zip'),
+    (((0, b'\x1f\x8b'),), 'application/gzip'),
+    (((0, b'ID3'),), 'audio/mpeg'),
+    (((4, b'ftyp'),), 'video/mp4'),
+    (((0, b'\x7fELF'),), 'application/x-executable'),
+    (((0, b'MZ'),), 'application/x-msdownload'),
+)
+
+# Content a file with this extension must have. Formats without a reliable
+# signature (txt, csv, json...) are not listed and are never rejected here.
+EXTENSION_TYPES = {
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'gif': 'image/gif',
+    'webp': 'image/webp',
+    'bmp': 'image/bmp',
+    'tif': 'image/tiff',
+    'tiff': 'image/tiff',
+    'pdf': 'application/pdf',
+    'zip': 'application/zip',
+    'docx': 'application/zip',
+    'xlsx': 'application/zip',
+    'pptx': 'application/zip',
+    'gz': 'application/gzip',
+    'mp3': 'audio/mpeg',
+    'mp4': 'video/mp4',
+}
+
+
+class UploadRejected(Exception):
+    status_code = 400
+
+    def __init__(self, field, message):
+        super().__init__(message)
+        self.field = field
+        self.message = message
+
+
+class UploadTooLarge(UploadRejected):
+    status_code = 413
+
+
+def file_extension(filename):
+    return (filename or '').split('.')[-1]
+
+
+def sniff_content_type(head):
+    for checks, content_type in MAGIC_NUMBERS:
+        if all(head.startswith(signature, offset) for offset, signature in checks):
+            return content_type
+    if _looks_like_text(head):
+        return 'text/plain'
+    return 'application/octet-stream'
+
+
+def _looks_like_text(head):
+    if b'\x00' in head:
+        return False
+    try:
+        head.decode('utf8')
+    except UnicodeDecodeError as error:
+        # A multi-byte character cut off at the end of the sniffed window.
+        return error.start >= len(head) - 3 and error.reason == 'unexpected end of data'
+    return True
+
+
+def expected_content_types(filename, allowed_types=None):
+    # Content types an upload named ``filename`` may have, or None when any
+    # content is acceptable.
+    if allowed_types is not None:
+        return frozenset(allowed_types)
+    content_type = EXTENSION_TYPES.get(file_extension(filename).lower())
+    return frozenset((content_type,)) if content_type else None
+
+
+class UploadSpool:
+    # Writable file object handed to the multipart parser for one upload. It
+    # counts bytes and sniffs the first SNIFF_BYTES as they arrive, and fails
+    # the write that crosses ``max_size`` or that shows the content is not an
+    # allowed type, so the rest of the body is never read.
+
+    def __init__(self, field, max_size=None, allowed_types=None, hash=None, message=None):
+        self.file = SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES, mode='rb+')
+        self.field = field
+        self.max_size = max_size
+        self.allowed_types = allowed_types
+        self.message = message
+        self.size = 0
+        self.head = b''
+        self.content_type = None
+        self._hash = hashlib.new(hash) if hash else None
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_size and self.size > self.max_size:
+            self._reject(UploadTooLarge, 'File size is too large.')
+        if self.content_type is None:
+            self.head += data[:SNIFF_BYTES - len(self.head)]
+            if len(self.head) >= SNIFF_BYTES:
+                self._sniff()
+        if self._hash is not None:
+            self._hash.update(data)
+        return self.file.write(data)
+
+    def seek(self, *args):
+        # The parser rewinds the file once the part is complete; files shorter
+        # than the sniff window are identified here.
+        if self.content_type is None:
+            self._sniff()
+        return self.file.seek(*args)
+
+    @property
+    def digest(self):
+        return self._hash.hexdigest() if self._hash is not None else None
+
+    def _sniff(self):
+        self.content_type = sniff_content_type(self.head)
+        if self.allowed_types is not None and self.content_type not in self.allowed_types:
+            self._reject(UploadRejected, 'File content does not match its type.')
+
+    def _reject(self, error_class, message):
+        self.file.close()
+        raise error_class(self.field, self.message or message)
+
+    def __iter__(self):
+        return iter(self.file)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+def file_info(value):
+    # (size, content type) of an uploaded FileStorage. Spooled uploads already
+    # know both; anything else is measured from its stream without reading
+    # past the sniff window.
+    stream = value.stream
+    if isinstance(stream, UploadSpool):
+        if stream.content_type is None:
+            stream.content_type = sniff_content_type(stream.head)
+        return stream.size, stream.content_type
+
+    position = stream.tell()
+    head = stream.read(SNIFF_BYTES)
+    stream.seek(0, 2)
+    size = stream.tell()
+    stream.seek(position)
+    return size, sniff_content_type(head)
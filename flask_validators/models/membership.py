@@ -0,0 +1,261 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.orm import sessionmaker
+
+from flask_validators import instrumentation
+
+DEFAULT_ERROR_RATE = 0.01
+DEFAULT_TTL = 60
+MIN_CAPACITY = 1024
+# Rows fetched per round trip while scanning the column.
+SCAN_BATCH_ROWS = 10000
+# Seconds before a failed background rebuild is tried again.
+RETRY_DELAY = 10
+
+logger = logging.getLogger('flask_validators')
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=DEFAULT_ERROR_RATE):
+        capacity = max(int(capacity), 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing: two 64-bit halves of one digest give all k positions.
+        digest = hashlib.blake2b(key.encode('utf8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class MembershipIndex:
+    # Answers "is this value definitely absent from model_class.field?" without
+    # a query. A Bloom filter never gives false negatives for values it has
+    # seen: the last scan plus the inserts flushed through this process's
+    # sessions. A miss is authoritative only for those; rows written by other
+    # processes or outside the ORM are missed until the next rebuild (ttl).
+    # Deleted rows cannot be removed from a Bloom filter; they only cause
+    # extra queries until the next rebuild.
+    #
+    # A stale filter is rebuilt on a background thread when a ``Session``
+    # factory is given, and in the request that notices it only with
+    # ``rebuild_on_request``. Otherwise it is not used any more and the
+    # database answers until warm() is called again.
+
+    def __init__(self, model_class, field, capacity=None, error_rate=DEFAULT_ERROR_RATE, ttl=DEFAULT_TTL, normalize=str,
+                 Session=None, rebuild_on_request=False):
+        self.model_class = model_class
+        self.field = field
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.ttl = ttl
+        self.normalize = normalize
+        self.Session = Session
+        self.rebuild_on_request = rebuild_on_request
+        self.filter = None
+        self.loaded_at = None
+        self.deletes = 0
+        self._pending = None
+        self._next_attempt = 0.0
+        self._lock = threading.Lock()
+        self._warm_lock = threading.Lock()
+
+    def warm(self, session):
+        with self._warm_lock:
+            self._rebuild(session)
+        return self
+
+    def _rebuild(self, session):
+        with self._lock:
+            # Inserts flushed while we scan are replayed into the new filter.
+            self._pending = []
+        try:
+            # Sized from a count, then filled from a streamed scan, so the
+            # column is never held in memory as a whole.
+            column = getattr(self.model_class, self.field)
+            count = session.execute(select(func.count(column))).scalar()
+            instrumentation.count_query()
+            capacity = max(self.capacity or 0, count * 2, MIN_CAPACITY)
+            bloom = BloomFilter(capacity, self.error_rate)
+            scan = select(column).where(column.isnot(None)).execution_options(yield_per=SCAN_BATCH_ROWS)
+            normalize = self.normalize
+            for value in session.execute(scan).scalars():
+                bloom.add(normalize(value))
+            instrumentation.count_query()
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            for key in self._pending:
+                bloom.add(key)
+            self._pending = None
+            # loaded_at first: is_stale() reads it once filter is set.
+            self.loaded_at = time.monotonic()
+            self.filter = bloom
+            self.deletes = 0
+
+    def is_stale(self):
+        if self.filter is None:
+            return True
+        if self.ttl is not None and time.monotonic() - self.loaded_at > self.ttl:
+            return True
+        # Too many deletions or too many inserts past capacity both push the
+        # false-positive rate up; rebuild instead of degrading silently.
+        return self.deletes > self.filter.capacity // 10 or self.filter.count > self.filter.capacity
+
+    def _load(self, session):
+        # Concurrent first requests wait for one scan instead of each
+        # rebuilding in turn.
+        with self._warm_lock:
+            if self.filter is None:
+                self._rebuild(session)
+
+    def _rebuild_in_request(self, session):
+        if self.filter is None:
+            self._load(session)
+        elif self._warm_lock.acquire(blocking=False):
+            # Only one request rebuilds; the others keep using the old filter,
+            # which still holds every value it has seen.
+            try:
+                self._rebuild(session)
+            finally:
+                self._warm_lock.release()
+
+    def _rebuild_in_background(self):
+        if time.monotonic() < self._next_attempt or not self._warm_lock.acquire(blocking=False):
+            return
+        thread = threading.Thread(target=self._background_rebuild, daemon=True,
+                                  name=f'membership-index-{self.model_class.__name__}.{self.field}')
+        try:
+            thread.start()
+        except Exception:
+            self._warm_lock.release()
+            raise
+
+    def _background_rebuild(self):
+        try:
+            session = self.Session()
+            try:
+                self._rebuild(session)
+            finally:
+                session.close()
+        except Exception:
+            self._next_attempt = time.monotonic() + RETRY_DELAY
+            logger.exception('Rebuilding the membership index of %s.%s failed',
+                             self.model_class.__name__, self.field)
+        finally:
+            self._warm_lock.release()
+
+    def might_contain(self, value, session):
+        if self.is_stale():
+            if self.Session is not None:
+                # Requests keep the old filter while the new one is built.
+                self._rebuild_in_background()
+            elif self.rebuild_on_request:
+                self._rebuild_in_request(session)
+            bloom = self.filter
+            if bloom is None or (self.Session is None and self.is_stale()):
+                # Nothing loaded yet, or an expired filter nobody refreshes:
+                # only the database can answer.
+                return True
+        else:
+            bloom = self.filter
+        return self.normalize(value) in bloom
+
+    def add(self, value):
+        if value is None:
+            return
+        key = self.normalize(value)
+        with self._lock:
+            if self.filter is not None:
+                self.filter.add(key)
+            if self._pending is not None:
+                self._pending.append(key)
+
+    def discard(self, value):
+        if value is None:
+            return
+        with self._lock:
+            self.deletes += 1
+
+    def _after_insert(self, mapper, connection, target):
+        self.add(getattr(target, self.field))
+
+    def _after_update(self, mapper, connection, target):
+        history = inspect(target).attrs[self.field].history
+        for value in history.added:
+            self.add(value)
+        for value in history.deleted:
+            self.discard(value)
+
+    def _after_delete(self, mapper, connection, target):
+        self.discard(getattr(target, self.field))
+
+    def listen(self):
+        event.listen(self.model_class, 'after_insert', self._after_insert)
+        event.listen(self.model_class, 'after_update', self._after_update)
+        event.listen(self.model_class, 'after_delete', self._after_delete)
+
+    def remove_listeners(self):
+        event.remove(self.model_class, 'after_insert', self._after_insert)
+        event.remove(self.model_class, 'after_update', self._after_update)
+        event.remove(self.model_class, 'after_delete', self._after_delete)
+
+
+def enable_membership_index(model_class, field, session=None, **options):
+    # ``session`` is a Session used for the first scan, or a sessionmaker,
+    # which is also used to rebuild the filter in the background later.
+    if isinstance(session, sessionmaker):
+        options.setdefault('Session', session)
+        session = session()
+        try:
+            return enable_membership_index(model_class, field, session, **options)
+        finally:
+            session.close()
+    index = MembershipIndex(model_class, field, **options)
+    with _indexes_lock:
+        previous = _indexes.get((model_class, field))
+        if previous is not None:
+            previous.remove_listeners()
+        index.listen()
+        _indexes[(model_class, field)] = index
+    if session is not None:
+        index.warm(session)
+    return index
+
+
+def disable_membership_index(model_class, field):
+    with _indexes_lock:
+        index = _indexes.pop((model_class, field), None)
+    if index is not None:
+        index.remove_listeners()
+
+
+def get_membership_index(model_class, field):
+    return _indexes.get((model_class, field))
@@ -0,0 +1,77 @@
+import threading
+
+from sqlalchemy import Enum, Integer, String, UniqueConstraint, inspect
+
+_metadata = {}
+_metadata_lock = threading.Lock()
+
+
+def python_type(sqla_type):
+    if isinstance(sqla_type, String):
+        return str
+    elif isinstance(sqla_type, Integer):
+        return int
+    # Add more type conversions if needed
+    else:
+        return type(None)  # If unknown, return NoneType
+
+
+class ColumnInfo:
+    # What the model declares about one column, read once from the mapper.
+    __slots__ = ('name', 'python_type', 'length', 'nullable', 'required', 'enum', 'unique', 'primary_key')
+
+    def __init__(self, name, column, unique):
+        self.name = name
+        self.python_type = python_type(column.type)
+        # Enum is a String subclass whose length is its longest member; the
+        # member check already covers it.
+        self.length = getattr(column.type, 'length', None) if not isinstance(column.type, Enum) else None
+        self.nullable = column.nullable
+        # A NOT NULL column the database or the model can fill in may be
+        # left out of the payload.
+        self.required = not (column.nullable or column.primary_key or column.default is not None
+                             or column.server_default is not None)
+        self.enum = frozenset(column.type.enums) if isinstance(column.type, Enum) else None
+        self.unique = unique
+        self.primary_key = column.primary_key
+
+
+class ModelMetadata:
+    def __init__(self, model_class):
+        mapper = inspect(model_class)
+        unique_columns = set()
+        for table in mapper.tables:
+            for constraint in table.constraints:
+                if isinstance(constraint, UniqueConstraint) and len(constraint.columns) == 1:
+                    unique_columns.update(constraint.columns)
+            for index in table.indexes:
+                if index.unique and len(index.columns) == 1:
+                    unique_columns.update(index.columns)
+
+        self.model_class = model_class
+        self.columns = {}
+        for attribute in mapper.column_attrs:
+            if len(attribute.columns) != 1:
+                continue
+            column = attribute.columns[0]
+            unique = bool(column.unique) or column.primary_key or column in unique_columns
+            self.columns[attribute.key] = ColumnInfo(attribute.key, column, unique)
+
+    def column(self, field):
+        return self.columns.get(field)
+
+
+def model_metadata(model_class):
+    # Built on first use and kept for the life of the process; models do not
+    # change their columns at runtime.
+    metadata = _metadata.get(model_class)
+    if metadata is None:
+        with _metadata_lock:
+            metadata = _metadata.get(model_class)
+            if metadata is None:
+                metadata = _metadata[model_class] = ModelMetadata(model_class)
+    return metadata
+
+
+def column_info(model_class, field):
+    return model_metadata(model_class).column(field)
@@ -0,0 +1,116 @@
+DEFAULT_MAX_ERRORS = 100
+
+
+def pointer_token(name):
+    # RFC 6901 escaping of one JSON pointer segment.
+    return str(name).replace('~', '~0').replace('/', '~1')
+
+
+def _container_error(field, value, context):
+    if field.fields is not None:
+        if not isinstance(value, dict):
+            return 'Expected an object.'
+    else:
+        if not isinstance(value, list):
+            return 'Expected a list.'
+        if field.min_items is not None and len(value) < field.min_items:
+            return f'Expected at least {field.min_items} items.'
+        if field.max_items is not None and len(value) > field.max_items:
+            return f'Expected at most {field.max_items} items.'
+    is_valid, error_message = field.run_validators(value, context)
+    return None if is_valid else error_message
+
+
+def _children(field, value, pointer, context):
+    # Lazily, so a long list costs nothing past the point where validation
+    # stops. Items of a list see the object holding the list as context.
+    if field.fields is not None:
+        for name, child in field.fields.items():
+            child_pointer = f'{pointer}/{pointer_token(name)}'
+            yield child, value.get(name), child_pointer, value
+    else:
+        items = field.items
+        if items is None:
+            return
+        for index, item in enumerate(value):
+            yield items, item, f'{pointer}/{index}', context
+
+
+def validate_value(field, value, key, context, errors, max_errors=DEFAULT_MAX_ERRORS, pointer=None):
+    # Validates ``value`` and everything nested in it without recursion: an
+    # explicit stack holds one iterator per open object or list. The error
+    # for ``value`` itself goes under ``key``; nested ones under their JSON
+    # pointer, which starts from ``pointer`` (``/key`` by default). Returns
+    # True once ``errors`` holds ``max_errors`` entries and validation stopped.
+    if value is None:
+        if field.required:
+            errors[key] = 'This field is required.'
+        return max_errors is not None and len(errors) >= max_errors
+
+    if pointer is None:
+        pointer = '/' + pointer_token(key)
+    stack = [iter(((field, value, pointer, context),))]
+    first = True
+    while stack:
+        entry = next(stack[-1], None)
+        if entry is None:
+            stack.pop()
+            continue
+        field, value, pointer, context = entry
+        error_key = key if first else pointer
+        first = False
+
+        if value is None:
+            if not field.required:
+                continue
+            error_message = 'This field is required.'
+        elif not field.nested:
+            is_valid, error_message = field.validate(value, context=context)
+            if is_valid:
+                continue
+        else:
+            error_message = _container_error(field, value, context)
+            if error_message is None:
+                stack.append(_children(field, value, pointer, value if field.fields is not None else context))
+                continue
+
+        errors[error_key] = error_message
+        if max_errors is not None and len(errors) >= max_errors:
+            return True
+    return False
+
+
+def validate_fields(fields, data, max_errors=DEFAULT_MAX_ERRORS):
+    # {name: message} for top-level fields, plus {json pointer: message} for
+    # anything nested. Returns (errors, stopped); ``stopped`` is True when
+    # the ``max_errors`` cap was reached and the rest was skipped.
+    errors = {}
+    for name, field in fields.items():
+        value = data.get(name)
+        if field.nested:
+            if validate_value(field, value, name, data, errors, max_errors):
+                return errors, True
+            continue
+        if value is None:
+            if not field.required:
+                continue
+            errors[name] = 'This field is required.'
+        else:
+            is_valid, error_message = field.validate(value, context=data)
+            if is_valid:
+                continue
+            errors[name] = error_message
+        if max_errors is not None and len(errors) >= max_errors:
+            return errors, True
+    return errors, False
+
+
+def first_error(field, value, context=None):
+    # (is_valid, message) for a nested field, as Field.validate returns it.
+    # The message of a nested failure is prefixed with its JSON pointer.
+    errors = {}
+    validate_value(field, value, '', context, errors, max_errors=1, pointer='')
+    if not errors:
+        return True, None
+    pointer, error_message = next(iter(errors.items()))
+    return False, f'{pointer}: {error_message}' if pointer else error_message
@@ -1,15 +1,44 @@
-import re
 import json
+import threading
+
+from collections import OrderedDict
+from functools import partial
 
 from urllib.parse import urlparse
 from datetime import datetime
 
+from .cost import cost_rank, validator_cost
+from .files import expected_content_types, file_extension, file_info
+from .fields import (Field, takes_context, EMAIL_RE, SPECIAL_CHAR_RE, PHONE_RE, ZIPCODE_RE, CREDIT_CARD_RE, SSN_RE,
+                     IP_ADDRESS_RE, HEX_COLOR_RE, LATITUDE_RE, LONGITUDE_RE, REGEX_VALIDATORS)
+from flask_validators import instrumentation
+
+TYPE_CHECKS = {
+    'string': 'str',
+    'integer': 'int',
+    'float': 'float',
+    'boolean': 'bool',
+}
+
+# Generated source is shared by every Schema with the same definition, so
+# building the same schema twice only pays for code generation once. The
+# cache is an LRU bounded to COMPILED_CACHE_SIZE definitions, so schemas
+# built on the fly do not accumulate.
+COMPILED_CACHE_SIZE = 256
+_compiled_cache = OrderedDict()
+_compiled_cache_lock = threading.Lock()
+
 class Schema:
     def __init__(self, schema):
         self.schema = schema
         self.fields = schema
+        for name, field in schema.items():
+            if isinstance(field, Field):
+                field.bind_name(name)
 
-    def validate(self, data):
+    def validate(self, data, fail_fast=False):
+        # fail_fast stops a field at its first error, running its validators
+        # cheapest first; fail_fast='request' also skips every later field.
         errors = {}
         for field, rules in self.schema.items():
             value = data.get(field)
@@ -18,24 +47,171 @@ class Schema:
             if rules.get('required') and not value:
                 field_errors.append('This field is required.')
 
-            if 'type' in rules and not self.validate_type(value, rules['type']):
+            if 'type' in rules and not (fail_fast and field_errors) and not self.validate_type(value, rules['type']):
                 field_errors.append(f'Expected a {rules["type"]}.')
 
-            if 'validators' in rules:
-                for validator in rules['validators']:
+            if 'validators' in rules and not (fail_fast and field_errors):
+                validators = rules['validators']
+                if fail_fast:
+                    validators = sorted(validators, key=self._validator_rank)
+                for validator in validators:
                     validator_name = validator['name']
                     validator_func = getattr(self, f'validate_{validator_name}')
                     validator_args = validator.get('args', ())
                     validator_kwargs = validator.get('kwargs', {})
+                    if takes_context(validator_func):
+                        validator_kwargs = dict(validator_kwargs, context=data)
 
-                    if not validator_func(value, *validator_args, **validator_kwargs):
-                        field_errors.append(validator['message'])
+                    if instrumentation.active:
+                        is_valid, error_message = instrumentation.call('schema', field, validator_name, partial(validator_func, value, *validator_args, **validator_kwargs))
+                    else:
+                        is_valid, error_message = validator_func(value, *validator_args, **validator_kwargs)
+                    if not is_valid:
+                        field_errors.append(validator.get('message') or error_message)
+                        if fail_fast:
+                            break
 
             if field_errors:
                 errors[field] = field_errors[0] if len(field_errors) == 1 else field_errors
+                if fail_fast == 'request':
+                    break
 
         return errors
 
+    @staticmethod
+    def _validator_rank(validator):
+        return cost_rank(validator.get('cost') or validator_cost(f'validate_{validator["name"]}'))
+
+    def compile(self, fail_fast=False):
+        # Returns a function equivalent to ``lambda data: self.validate(data,
+        # fail_fast)``, generated as straight-line Python for this schema: type
+        # checks are inlined, pure regex validators become precompiled
+        # pattern matches and the per-field loop is unrolled.
+        compiled = self.__dict__.setdefault('_compiled', {})
+        if fail_fast not in compiled:
+            # Keyed in declaration order: the generated code reads its
+            # constants by position, so reordered fields need their own.
+            key = (type(self), fail_fast, json.dumps(list(self.schema.items()), default=repr))
+            with _compiled_cache_lock:
+                factory = _compiled_cache.get(key)
+                if factory is not None:
+                    _compiled_cache.move_to_end(key)
+            if factory is None:
+                factory = self._generate(fail_fast)
+                with _compiled_cache_lock:
+                    factory = _compiled_cache.setdefault(key, factory)
+                    while len(_compiled_cache) > COMPILED_CACHE_SIZE:
+                        _compiled_cache.popitem(last=False)
+            compiled[fail_fast] = factory(self, self._constants(fail_fast))
+        return compiled[fail_fast]
+
+    def _field_validators(self, rules, fail_fast):
+        validators = rules.get('validators', [])
+        if fail_fast:
+            validators = sorted(validators, key=self._validator_rank)
+        return validators
+
+    def _constants(self, fail_fast):
+        # Everything the generated code needs besides builtins: field names,
+        # messages, bound validators and their arguments, by position.
+        constants = []
+        for field, rules in self.schema.items():
+            constants.append(field)
+            for validator in self._field_validators(rules, fail_fast):
+                constants.append((
+                    getattr(self, f'validate_{validator["name"]}'),
+                    tuple(validator.get('args', ())),
+                    dict(validator.get('kwargs', {})),
+                    validator.get('message'),
+                ))
+        return constants
+
+    def _inline_regex(self, validator):
+        regex = REGEX_VALIDATORS.get(validator['name'])
+        method = f'validate_{validator["name"]}'
+        if regex is None or validator.get('args') or validator.get('kwargs'):
+            return None
+        # A subclass overriding the method keeps its own behaviour.
+        if getattr(type(self), method) is not getattr(Schema, method):
+            return None
+        return regex
+
+    def _generate(self, fail_fast):
+        lines = ['def factory(schema, c):']
+        body = [
+            'def validate(data):',
+            '    if instrumentation.active:',
+            f'        return schema.validate(data, {fail_fast!r})',
+            '    errors = {}',
+            '    get = data.get',
+        ]
+        patterns = {}
+        position = 0
+        for field, rules in self.schema.items():
+            if not isinstance(rules, dict):
+                raise ValueError(f'Schema.compile() needs rule dicts, got {type(rules).__name__} for {field!r}')
+            name = f'n{position}'
+            lines.append(f'    {name} = c[{position}]')
+            position += 1
+            checks = []
+            if rules.get('required'):
+                checks.append(('not value', "'This field is required.'"))
+            if 'type' in rules:
+                type_name = TYPE_CHECKS.get(rules['type'])
+                condition = f'not isinstance(value, {type_name})' if type_name else 'True'
+                checks.append((condition, repr(f'Expected a {rules["type"]}.')))
+
+            validator_steps = []
+            for validator in self._field_validators(rules, fail_fast):
+                validator_func = getattr(self, f'validate_{validator["name"]}')  # Unknown validators fail here, not per request
+                regex = self._inline_regex(validator)
+                slot = position
+                position += 1
+                if regex is not None:
+                    pattern_name = patterns.setdefault(validator['name'], f'p_{validator["name"]}')
+                    message = f'c[{slot}][3] or {regex[1]!r}'
+                    validator_steps.append((f'{pattern_name}(value) is None', message, None, None))
+                else:
+                    lines.append(f'    v{slot}, a{slot}, k{slot}, m{slot} = c[{slot}]')
+                    context = ', context=data' if takes_context(validator_func) else ''
+                    validator_steps.append((None, None, slot, context))
+
+            body.append(f'    value = get({name})')
+            body.append('    field_errors = []')
+            for condition, message in checks:
+                guard = 'not field_errors and ' if fail_fast else ''
+                body.append(f'    if {guard}{condition}:')
+                body.append(f'        field_errors.append({message})')
+            for condition, message, slot, context in validator_steps:
+                indent = '    '
+                if fail_fast:
+                    body.append('    if not field_errors:')
+                    indent = '        '
+                if slot is None:
+                    body.append(f'{indent}if {condition}:')
+                    body.append(f'{indent}    field_errors.append({message})')
+                else:
+                    body.append(f'{indent}is_valid, error_message = v{slot}(value, *a{slot}{context}, **k{slot})')
+                    body.append(f'{indent}if not is_valid:')
+                    body.append(f'{indent}    field_errors.append(m{slot} or error_message)')
+            body.append('    if field_errors:')
+            body.append(f'        errors[{name}] = field_errors[0] if len(field_errors) == 1 else field_errors')
+            if fail_fast == 'request':
+                body.append('        return errors')
+        body.append('    return errors')
+
+        for validator_name, pattern_name in patterns.items():
+            lines.append(f'    {pattern_name} = PATTERNS[{validator_name!r}][0].match')
+        lines.extend('    ' + line for line in body)
+        lines.append('    return validate')
+
+        source = '\n'.join(lines) + '\n'
+        namespace = {'PATTERNS': REGEX_VALIDATORS, 'instrumentation': instrumentation}
+        exec(compile(source, '<flask_validators.Schema.compile>', 'exec'), namespace)
+        factory = namespace['factory']
+        factory.source = source
+        return factory
+
     def validate_type(self, value, expected_type):
         if expected_type == 'string':
             return isinstance(value, str)
@@ -48,7 +224,7 @@ class Schema:
         # Add more type validations as needed
 
     def validate_email(self, value):
-        if re.match(r'^[\w\.-]+@[\w\.-]+\.\w+$', value):
+        if EMAIL_RE.match(value):
             return True, None
         return False, 'Invalid email address.'
 
@@ -64,7 +240,7 @@ class Schema:
 
     def validate_password(self, value, min_length=8, max_length=16, require_special_char=True):
         if isinstance(value, str) and min_length <= len(value) <= max_length:
-            if require_special_char and re.search(r'\W', value):
+            if require_special_char and SPECIAL_CHAR_RE.search(value):
                 return True, None
         return False, 'Invalid password.'
 
@@ -76,12 +252,12 @@ class Schema:
             return False, 'Invalid JSON.'
 
     def validate_phone(self, value):
-        if re.match(r'^\+?1?\d{9,15}$', value):
+        if PHONE_RE.match(value):
             return True, None
         return False, 'Invalid phone number.'
 
     def validate_zipcode(self, value):
-        if re.match(r'^\d{5}(-\d{4})?$', value):  # US zipcode format
+        if ZIPCODE_RE.match(value):  # US zipcode format
             return True, None
         return False, 'Invalid zipcode.'
 
@@ -94,13 +270,13 @@ class Schema:
 
     def validate_credit_card(self, value):
         # naive check for 16 digit number with optional hyphens or spaces
-        if re.match(r'^(\d{4}[-\s]?){3}\d{4}$', value):
+        if CREDIT_CARD_RE.match(value):
             return True, None
         return False, 'Invalid credit card number.'
 
     def validate_ssn(self, value):
         # naive check for US SSN (XXX-XX-XXXX)
-        if re.match(r'^\d{3}-\d{2}-\d{4}$', value):
+        if SSN_RE.match(value):
             return True, None
         return False, 'Invalid social security number.'
 
@@ -112,36 +288,43 @@ class Schema:
             return False, 'Invalid URL.'
 
     def validate_ip_address(self, value):
-        if re.match(r'^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$', value):  # naive IPv4 check
+        if IP_ADDRESS_RE.match(value):  # naive IPv4 check
             return True, None
         return False, 'Invalid IP address.'
 
     def validate_hex_color(self, value):
-        if re.match(r'^#([A-Fa-f0-9]{6}|[A-Fa-f0-9]{3})$', value):
+        if HEX_COLOR_RE.match(value):
             return True, None
         return False, 'Invalid hexadecimal color code.'
 
     def validate_latitude(self, value):
-        if re.match(r'^[-+]?([1-8]?\d(\.\d+)?|90(\.0+)?)$', value):
+        if LATITUDE_RE.match(value):
             return True, None
         return False, 'Invalid latitude.'
 
     def validate_longitude(self, value):
-        if re.match(r'^[-+]?(180(\.0+)?|((1[0-7]\d)|([1-9]?\d))(\.\d+)?)$', value):
+        if LONGITUDE_RE.match(value):
             return True, None
         return False, 'Invalid longitude.'
 
-    def validate_file(self, value, allowed_extensions=None, max_size=None):
-        if allowed_extensions and value.filename.split('.')[-1] not in allowed_extensions:
+    def validate_file(self, value, allowed_extensions=None, max_size=None, allowed_types=None, hash=None):
+        # ``hash`` only matters while the upload streams; see controllers.upload.
+        if allowed_extensions and file_extension(value.filename) not in allowed_extensions:
             return False, 'Invalid file extension.'
-        
-        if max_size and value.content_length > max_size:
+
+        # The multipart Content-Length is usually missing, so measure the file.
+        size, content_type = file_info(value)
+        if max_size and size > max_size:
             return False, 'File size is too large.'
 
+        expected_types = expected_content_types(value.filename, allowed_types)
+        if expected_types is not None and content_type not in expected_types:
+            return False, 'File content does not match its type.'
+
         return True, None
 
-    def validate_confirm_password(self, value, password_field):
-        password = self.data.get(password_field)
+    def validate_confirm_password(self, value, password_field, context=None):
+        password = (context or {}).get(password_field)
         if password != value:
             return False, 'Passwords must match.'
         return True, None
\ No newline at end of file
@@ -1,14 +1,54 @@
 from functools import wraps
 from flask import request, jsonify
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import String, Integer
+from sqlalchemy import exists, select
 import re
 
+from .membership import get_membership_index
+from .metadata import column_info, python_type
+from flask_validators import instrumentation
+
+# Checks that need a database round trip. The validate_db decorator batches
+# these into a single query per model instead of running them one by one.
+QUERY_CHECKS = ('check_unique', 'check_existence')
+
+def run_query_checks(model_class, session, checks):
+    # checks is a list of (check_name, value, data) tuples. Every check becomes
+    # one EXISTS column of a single SELECT, so the whole batch costs one round
+    # trip and never loads an ORM entity.
+    results = [(True, None)] * len(checks)
+    columns = []
+    positions = []
+    for position, (check_name, value, data) in enumerate(checks):
+        if check_name == 'check_existence' and not value:
+            continue
+        index = get_membership_index(model_class, data.get('field'))
+        if index is not None and value is not None and not index.might_contain(value, session):
+            # Definite miss: the value is unique and does not exist.
+            if check_name == 'check_existence':
+                results[position] = False, f'{data.get("field").capitalize()} does not exist.'
+            continue
+        criteria = [getattr(model_class, data.get('field')) == value]
+        if check_name == 'check_unique' and data.get('id') is not None:
+            criteria.append(model_class.id != data.get('id'))  # Ignore the record being updated
+        columns.append(exists().where(*criteria).label(f'check_{len(columns)}'))
+        positions.append(position)
+
+    if not columns:
+        return results
+
+    row = session.execute(select(*columns)).one()
+    instrumentation.count_query()
+    for position, found in zip(positions, row):
+        check_name, _, data = checks[position]
+        if check_name == 'check_unique' and found:
+            results[position] = False, f'{data.get("field").capitalize()} already exists.'
+        elif check_name == 'check_existence' and not found:
+            results[position] = False, f'{data.get("field").capitalize()} does not exist.'
+    return results
+
 def check_unique(model_class, session, value, data):
-    query = session.query(model_class).filter(getattr(model_class, data.get('field')) == value).first()
-    if query and query.id != data.get('id'):  # Compare against the existing record's ID
-        return False, f'{data.get("field").capitalize()} already exists.'
-    return True, None
+    return run_query_checks(model_class, session, [('check_unique', value, data)])[0]
 
 def check_null(model_class, session, value, data):
     if not value:
@@ -16,15 +56,17 @@ def check_null(model_class, session, value, data):
     return True, None
 
 def check_existence(model_class, session, value, data):
-    id_value = value
-    if id_value:
-        query = session.query(model_class).filter(getattr(model_class, data.get('field')) == id_value).first()
-        if not query:
-            return False, f'{data.get("field").capitalize()} does not exist.'
-    return True, None
+    return run_query_checks(model_class, session, [('check_existence', value, data)])[0]
+
+def _declared(model_class, data):
+    # Limits not passed explicitly come from the column definition.
+    return column_info(model_class, data.get('field'))
 
 def check_range(model_class, session, value, data):
-    field_range = data.get('range', (0, 100))  # Default range if not provided
+    field_range = data.get('range')
+    if field_range is None:
+        info = _declared(model_class, data)
+        field_range = (0, info.length) if info is not None and info.length else (0, 100)  # Default range if not provided
     if len(value) < field_range[0] or len(value) > field_range[1]:
         return False, f'{data.get("field").capitalize()} must be between {field_range[0]} and {field_range[1]} characters.'
     return True, None
@@ -32,29 +74,74 @@ def check_range(model_class, session, value, data):
 def check_type(model_class, session, value, data):
     if value is None:  # Do not perform type checking on None values
         return True, None
-    expected_type = python_type(getattr(model_class, data.get('field')).type)
+    info = _declared(model_class, data)
+    expected_type = info.python_type if info is not None else python_type(getattr(model_class, data.get('field')).type)
     if not isinstance(value, expected_type):
         return False, f'{data.get("field").capitalize()} must be of type {expected_type.__name__}.'
     return True, None
 
-def python_type(sqla_type):
-    if isinstance(sqla_type, String):
-        return str
-    elif isinstance(sqla_type, Integer):
-        return int
-    # Add more type conversions if needed
-    else:
-        return type(None)  # If unknown, return NoneType
-
 def check_enum(model_class, session, value, data):
     # Assumes data['enum'] is a list of valid options
-    if value not in data.get('enum', []):
+    options = data.get('enum')
+    if options is None:
+        info = _declared(model_class, data)
+        options = info.enum if info is not None and info.enum is not None else []
+    if value not in options:
         return False, f'{data.get("field").capitalize()} is not a valid option.'
     return True, None
 
 def check_length(model_class, session, value, data):
     # Checks if the length of the value is not beyond the specified limit
     limit = data.get('length')
+    if limit is None:
+        info = _declared(model_class, data)
+        limit = info.length if info is not None else None
     if limit and len(value) > limit:
         return False, f'{data.get("field").capitalize()} exceeds the length limit.'
-    return True, None
\ No newline at end of file
+    return True, None
+
+def _fits_type(value, expected_type):
+    if expected_type is int:
+        if isinstance(value, bool):
+            return False
+        if isinstance(value, str):
+            # Form values arrive as text; accept what the column would parse.
+            try:
+                int(value)
+            except ValueError:
+                return False
+            return True
+        return isinstance(value, int)
+    return isinstance(value, expected_type)
+
+def check_column(model_class, session, value, data):
+    # Everything the column declares that can be checked without a query:
+    # NOT NULL, type, String length and Enum members.
+    info = _declared(model_class, data)
+    if info is None:
+        return True, None
+    field = data.get('field').capitalize()
+    if value is None:
+        if info.required:
+            return False, f'{field} is required.'
+        return True, None
+    if info.python_type in (str, int) and not _fits_type(value, info.python_type):
+        return False, f'{field} must be of type {info.python_type.__name__}.'
+    if info.enum is not None:
+        if value not in info.enum:
+            return False, f'{field} is not a valid option.'
+    elif info.length and isinstance(value, str) and len(value) > info.length:
+        return False, f'{field} exceeds the length limit.'
+    return True, None
+
+def derived_checks(model_class, field, declared=()):
+    # The checks the model implies for ``field``: check_column always, and
+    # check_unique for a unique, non primary key column unless the field
+    # already queries the database.
+    info = column_info(model_class, field)
+    if info is None:
+        return []
+    checks = ['check_column']
+    if info.unique and not info.primary_key and not set(declared) & set(QUERY_CHECKS):
+        checks.append('check_unique')
+    return checks
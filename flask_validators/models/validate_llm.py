@@ -1,10 +1,300 @@
+import hashlib
+import threading
+import numpy as np
+
+from collections import OrderedDict, namedtuple
 from langid.langid import LanguageIdentifier, model as langid_model
 
+CACHE_SIZE = 4096
+
+# Texts longer than LONG_TEXT_CHARS are not scored whole. Up to MAX_WINDOWS
+# windows of WINDOW_CHARS, spread over the text, are scored one at a time
+# until the leading language reaches CONFIDENCE, so the cost is bounded
+# whatever the length of the input. Lengths are in characters (bytes for a
+# bytes value): a window of non-Latin text encodes to up to 4 bytes per
+# character, and that is what bytes_scored reports.
+LONG_TEXT_CHARS = 16 * 1024
+WINDOW_CHARS = 2048
+MAX_WINDOWS = 8
+MIN_WINDOWS = 2
+CONFIDENCE = 0.99
+
+# Rows of the feature matrix scored per np.dot, so peak memory stays the
+# same however many values a request sends.
+BATCH_ROWS = 256
+
+Detection = namedtuple('Detection', 'language confidence bytes_scored')
+
+_identifier = None
+_full_model = None
+_identifier_lock = threading.Lock()
+
+_cache = OrderedDict()
+_cache_generation = 0
+_cache_size = CACHE_SIZE
+_cache_lock = threading.Lock()
+
+_long_text = (LONG_TEXT_CHARS, WINDOW_CHARS, MAX_WINDOWS, CONFIDENCE)
+
+
+def _build_identifier(languages=None):
+    # Decoding the model string is the expensive part, so it happens once per
+    # process. Every identifier after that shares the same unpacked arrays.
+    global _full_model
+    if _full_model is None:
+        base = LanguageIdentifier.from_modelstring(langid_model, norm_probs=True)
+        _full_model = (base.nb_ptc, base.nb_pc, base.nb_numfeats, base.nb_classes,
+                       base.tk_nextmove, base.tk_output)
+    identifier = LanguageIdentifier(*_full_model, norm_probs=True)
+    if languages is not None:
+        identifier.set_languages(languages)
+    return identifier
+
+
+def get_identifier():
+    identifier = _identifier
+    if identifier is None:
+        identifier = load_identifier()
+    return identifier
+
+
+def load_identifier(languages=None):
+    global _identifier
+    with _identifier_lock:
+        if _identifier is None or languages is not None:
+            _identifier = _build_identifier(languages)
+            clear_cache()
+        return _identifier
+
+
+def set_languages(languages=None):
+    # Swap in a fresh identifier rather than trimming the shared one in place,
+    # so requests classifying concurrently never see a half-updated model.
+    global _identifier
+    with _identifier_lock:
+        _identifier = _build_identifier(languages)
+        clear_cache()
+    return _identifier
+
+
+def set_cache_size(size):
+    global _cache_size
+    with _cache_lock:
+        _cache_size = size
+        while len(_cache) > max(size, 0):
+            _cache.popitem(last=False)
+
+
+def clear_cache():
+    global _cache_generation
+    with _cache_lock:
+        _cache.clear()
+        _cache_generation += 1
+
+
+def set_long_text(threshold_chars=LONG_TEXT_CHARS, window_chars=WINDOW_CHARS, max_windows=MAX_WINDOWS,
+                  confidence=CONFIDENCE):
+    # threshold_chars=None scores every text whole again.
+    global _long_text
+    if threshold_chars is None:
+        _long_text = None
+        return
+    if window_chars < 1 or threshold_chars < window_chars:
+        raise ValueError('threshold_chars must be at least window_chars, and window_chars positive.')
+    _long_text = (threshold_chars, window_chars, max(max_windows, 1), confidence)
+
+
+def _is_long(value):
+    # In characters: encoding a multi-megabyte string just to count its
+    # bytes would cost as much as the scoring we want to avoid.
+    settings = _long_text
+    return settings is not None and len(value) > settings[0]
+
+
+def _window_slots(slots):
+    # Start, end, then the midpoints of the largest gaps left (1/2, 1/4,
+    # 3/4, 1/8...), so the first windows already cover the whole text.
+    # Each of the ``slots`` non-overlapping windows comes up once at most.
+    seen = set()
+    fractions = [0.0, 1.0]
+    denominator = 2
+    while len(seen) < slots:
+        for fraction in fractions:
+            slot = int(round(fraction * (slots - 1)))
+            if slot not in seen:
+                seen.add(slot)
+                yield slot
+        fractions = [numerator / denominator for numerator in range(1, denominator, 2)]
+        denominator *= 2
+
+
+def _sampled_detection(value):
+    # Feature counts of the windows scored so far are summed and the sum is
+    # scored as one document after each window, so the confidence estimate
+    # sharpens as more of the text is seen.
+    threshold, window, max_windows, confidence = _long_text
+    identifier = get_identifier()
+    counts = None
+    bytes_scored = 0
+    # Windows sit on a grid of whole windows, so none overlaps another and
+    # no part of the text is counted twice.
+    slots = len(value) // window
+    if slots < 2:
+        language, probability = _classify_batch([value])[0]
+        size = len(value.encode('utf8')) if isinstance(value, str) else len(value)
+        return Detection(language, probability, size)
+    for scored, slot in enumerate(_window_slots(slots), start=1):
+        if scored > max_windows:
+            break
+        sample = value[slot * window:(slot + 1) * window]
+        if isinstance(sample, str):
+            sample = sample.encode('utf8')
+        bytes_scored += len(sample)
+        features = _feature_matrix(identifier, [sample])
+        counts = features if counts is None else counts + features
+        language, probability = _score(identifier, counts)[0]
+        if scored >= MIN_WINDOWS and probability >= confidence:
+            break
+    return Detection(language, probability, bytes_scored)
+
+
+def detect_language(value):
+    # Detection(language, confidence, bytes_scored) for one text. Long
+    # texts are sampled (see LONG_TEXT_CHARS) and never cached.
+    if _is_long(value):
+        return _sampled_detection(value)
+    language, probability = classify(value)
+    size = len(value.encode('utf8')) if isinstance(value, str) else len(value)
+    return Detection(language, probability, size)
+
+
+def _cache_key(value):
+    if isinstance(value, str):
+        value = value.encode('utf8')
+    return hashlib.blake2b(value, digest_size=16).digest()
+
+
+def classify(value):
+    if _is_long(value):
+        return _sampled_detection(value)[:2]
+    if _cache_size <= 0:
+        return get_identifier().classify(value)
+
+    key = _cache_key(value)
+    with _cache_lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+            return result
+        generation = _cache_generation
+
+    result = get_identifier().classify(value)
+
+    with _cache_lock:
+        # The language set changed while we were classifying; don't cache a
+        # result produced by the old identifier.
+        if generation != _cache_generation:
+            return result
+        _cache[key] = result
+        if len(_cache) > _cache_size:
+            _cache.popitem(last=False)
+    return result
+
+
+def _feature_matrix(identifier, values):
+    # Same tokenisation as LanguageIdentifier.instance2fv, but written into
+    # one preallocated matrix so a chunk of values is scored in a single dot.
+    fv = np.zeros((len(values), identifier.nb_numfeats), dtype='uint32')
+    tk_nextmove = identifier.tk_nextmove
+    tk_output = identifier.tk_output
+    for row, text in enumerate(values):
+        if isinstance(text, str):
+            text = text.encode('utf8')
+        state = 0
+        statecount = {}
+        for letter in text:
+            state = tk_nextmove[(state << 8) + letter]
+            statecount[state] = statecount.get(state, 0) + 1
+        for state, count in statecount.items():
+            for index in tk_output.get(state, ()):
+                fv[row, index] += count
+    return fv
+
+
+def _score(identifier, fv):
+    pd = np.dot(fv, identifier.nb_ptc) + identifier.nb_pc
+    best = np.argmax(pd, axis=1)
+    # Row-wise softmax; equivalent to langid's norm_probs for each document.
+    with np.errstate(over='ignore'):
+        probs = 1 / np.exp(pd - pd[np.arange(len(fv)), best][:, None]).sum(axis=1)
+    return [(str(identifier.nb_classes[cl]), float(conf)) for cl, conf in zip(best, probs)]
+
+
+def _classify_batch(values):
+    identifier = get_identifier()
+    results = []
+    for start in range(0, len(values), BATCH_ROWS):
+        results.extend(_score(identifier, _feature_matrix(identifier, values[start:start + BATCH_ROWS])))
+    return results
+
+
+def classify_many(values):
+    values = list(values)
+    if not values:
+        return []
+    if _long_text is not None and any(_is_long(value) for value in values):
+        # Long texts are sampled one by one; the rest still share a batch.
+        long_positions = [position for position, value in enumerate(values) if _is_long(value)]
+        short_positions = [position for position, value in enumerate(values) if not _is_long(value)]
+        results = [None] * len(values)
+        for position in long_positions:
+            results[position] = _sampled_detection(values[position])[:2]
+        for position, result in zip(short_positions, classify_many([values[p] for p in short_positions])):
+            results[position] = result
+        return results
+    if _cache_size <= 0:
+        return _classify_batch(values)
+
+    results = [None] * len(values)
+    misses = {}
+    with _cache_lock:
+        for position, value in enumerate(values):
+            key = _cache_key(value)
+            result = _cache.get(key)
+            if result is not None:
+                _cache.move_to_end(key)
+                results[position] = result
+            else:
+                misses.setdefault(key, []).append(position)
+        generation = _cache_generation
+
+    if misses:
+        keys = list(misses)
+        batch = _classify_batch([values[misses[key][0]] for key in keys])
+        with _cache_lock:
+            store = generation == _cache_generation
+            for key, result in zip(keys, batch):
+                for position in misses[key]:
+                    results[position] = result
+                if store:
+                    _cache[key] = result
+            while len(_cache) > _cache_size:
+                _cache.popitem(last=False)
+    return results
+
+
+def validate_languages(values, desired_language):
+    error_message = f'Value is not in the desired language ({desired_language}).'
+    return [
+        (True, None) if predicted_lang == desired_language else (False, error_message)
+        for predicted_lang, _ in classify_many(values)
+    ]
+
+
 def validate_language(value, desired_language):
-    identifier = LanguageIdentifier.from_modelstring(langid_model, norm_probs=True)
-    predicted_lang, _ = identifier.classify(value)
+    predicted_lang, _ = classify(value)
 
     if predicted_lang == desired_language:
         return True, None  # Value matches the desired language, return True and None
 
-    return False, f'Value is not in the desired language ({desired_language}).'
\ No newline at end of file
+    return False, f'Value is not in the desired language ({desired_language}).'
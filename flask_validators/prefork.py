@@ -0,0 +1,73 @@
+import gc
+import importlib
+
+
+def _warm_schema(schema):
+    # Fields resolve their plans when they are built; rule-dict schemas
+    # generate their compiled validator here instead of on first use.
+    fields = list(schema.fields.values())
+    if fields and all(isinstance(rules, dict) for rules in fields):
+        schema.compile()
+
+
+def _warm_model(model_class):
+    # Configures the mappers and builds the column metadata index the
+    # database checks read on every request.
+    from sqlalchemy.orm import configure_mappers
+
+    importlib.import_module('flask_validators.models.validate_db')
+    metadata = importlib.import_module('flask_validators.models.metadata')
+    configure_mappers()
+    metadata.model_metadata(model_class)
+
+
+def _warm_language():
+    llm = importlib.import_module('flask_validators.models.validate_llm')
+    llm.load_identifier()
+    # One uncached classification builds NumPy's dot and argmax paths too.
+    llm._classify_batch(['warmup'])
+
+
+def warmup(app=None, schemas=(), models=(), languages=False, freeze=True):
+    # Prepares everything the validators otherwise build on first use, so
+    # that calling this in a pre-fork server's master process (for example
+    # gunicorn's ``on_starting`` or ``when_ready`` hook) lets every worker
+    # share the pages copy-on-write. ``app`` is searched for views wrapped
+    # by the validation decorators; ``schemas`` and ``models`` add anything
+    # only used outside a view. ``languages=True`` loads the language model
+    # even when no validate_llm view was found. Returns what was prepared.
+    importlib.import_module('flask_validators.decorators.validation_decorator')
+
+    targets = []
+    if app is not None:
+        for view in app.view_functions.values():
+            targets.extend(getattr(view, 'validation_targets', ()))
+    targets.extend(('schema', schema) for schema in schemas)
+    targets.extend(('model', model_class) for model_class in models)
+    if languages:
+        targets.append(('language', None))
+
+    prepared = {'schemas': 0, 'models': 0, 'language_model': False}
+    seen = set()
+    for kind, target in targets:
+        if (kind, id(target)) in seen:
+            continue
+        seen.add((kind, id(target)))
+        if kind == 'schema':
+            _warm_schema(target)
+            prepared['schemas'] += 1
+        elif kind == 'model':
+            _warm_model(target)
+            prepared['models'] += 1
+        elif kind == 'language':
+            if not prepared['language_model']:
+                _warm_language()
+                prepared['language_model'] = True
+
+    if freeze:
+        # Objects surviving to here are moved out of the collector's reach;
+        # otherwise the first collection in each worker would write to every
+        # one of them and unshare the pages.
+        gc.collect()
+        gc.freeze()
+    return prepared
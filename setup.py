@@ -6,7 +6,7 @@ with open('READMEPypi.md', 'r', encoding='utf-8') as f:
 setup(
     name="flask_validators",
     version="1.0",
-    packages=find_packages(),
+    packages=find_packages(exclude=["benchmarks", "benchmarks.*"]),
     description="Flask request validation",
     long_description=long_description,
     long_description_content_type='text/markdown',
@@ -14,13 +14,21 @@ setup(
     author_email="zhorzholiani.dimitri@gmail.com",
     classifiers=[
         "Programming Language :: Python :: 3",
+        "Programming Language :: Python :: 3 :: Only",
         "Programming Language :: Python :: 3.9",
+        "Programming Language :: Python :: 3.10",
+        "Programming Language :: Python :: 3.11",
+        "Programming Language :: Python :: 3.12",
         "License :: OSI Approved :: MIT License",
     ],
     install_requires=[
         "flask",
-        "SQLAlchemy",
-        "langid",
     ],
-    python_requires='>=3.6',
+    extras_require={
+        "db": ["SQLAlchemy"],
+        "llm": ["langid", "numpy"],
+        "async": ["flask[async]", "SQLAlchemy[asyncio]"],
+        "all": ["SQLAlchemy[asyncio]", "langid", "numpy", "flask[async]"],
+    },
+    python_requires='>=3.9',
 )
\ No newline at end of file
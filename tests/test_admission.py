@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from flask import Flask, jsonify
+
+from flask_validators import validate_form
+from flask_validators.controllers.admission import json_depth
+
+LIMITS = {'max_body_bytes': 2048, 'max_fields': 3, 'max_field_length': 20, 'max_json_depth': 3}
+
+
+@pytest.mark.parametrize('body, depth', [
+    (b'{}', 1),
+    (b'[[[]]]', 3),
+    (b'{"a": [1, {"b": []}]}', 4),
+    (b'"just a string"', 0),
+    (b'{"a": "[[[[{{{{"}', 1),
+    (b'{"a": "quote \\" [[[ inside"}', 1),
+    (b'{"a": "escaped \\\\", "b": [[1]]}', 3),
+    (b'["\\\\\\"[[", ["]]]]"]]', 2),
+])
+def test_json_depth(body, depth):
+    assert json_depth(body) == depth
+    # Agrees with the decoded document.
+    def decoded_depth(value):
+        if isinstance(value, dict):
+            return 1 + max(map(decoded_depth, value.values()), default=0)
+        if isinstance(value, list):
+            return 1 + max(map(decoded_depth, value), default=0)
+        return 0
+    assert decoded_depth(json.loads(body)) == depth
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+
+    @app.route('/limited', methods=['POST'])
+    @validate_form('name', limits=LIMITS)
+    def limited():
+        return jsonify({'success': True})
+
+    return app.test_client()
+
+
+def test_within_limits(client):
+    response = client.post('/limited', json={'name': 'Jane', 'tags': [[1]]})
+    assert response.status_code == 200
+
+
+def test_max_body_bytes(client):
+    response = client.post('/limited', json={'name': 'Jane', 'bio': 'x' * 4096})
+    assert response.status_code == 413
+    assert response.get_json() == {'error': 'Request body is too large.'}
+
+
+@pytest.mark.parametrize('send', [
+    lambda client: client.post('/limited', json={'name': 'Jane', 'a': 1, 'b': 2, 'c': 3}),
+    lambda client: client.post('/limited', data='name=Jane&a=1&b=2&c=3',
+                               content_type='application/x-www-form-urlencoded'),
+], ids=['json', 'urlencoded'])
+def test_max_fields(client, send):
+    response = send(client)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Too many fields.'}
+
+
+def test_max_field_length(client):
+    response = client.post('/limited', json={'name': 'J' * 21})
+    assert response.status_code == 400
+    assert response.get_json() == {'name': 'Value is too long.'}
+
+
+def test_max_json_depth(client):
+    response = client.post('/limited', json={'name': 'Jane', 'deep': [[[1]]]})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'JSON nesting is too deep.'}
+
+
+def test_brackets_inside_strings_do_not_count(client):
+    response = client.post('/limited', json={'name': 'Jane', 'note': '[[[[ "{{{{'})
+    assert response.status_code == 200
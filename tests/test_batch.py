@@ -0,0 +1,101 @@
+import io
+import json
+
+import pytest
+
+from flask_validators import batch
+
+RULES = {
+    'id': {'required': True, 'type': 'integer'},
+    'email': {'required': True, 'validators': [{'name': 'email'}]},
+}
+SCHEMA_SPEC = 'test_batch:RULES'
+
+
+def _records(count):
+    return [{'id': i if i % 7 else 'x', 'email': f'user{i}@example.com' if i % 5 else 'bad'} for i in range(count)]
+
+
+def _run(path, **options):
+    output = io.StringIO()
+    summary = batch.validate_file(SCHEMA_SPEC, str(path), output, **options)
+    return summary, [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_next_line_start_finds_the_following_line(tmp_path, monkeypatch):
+    # Small read blocks so a search has to cross block boundaries.
+    monkeypatch.setattr(batch, 'READ_BLOCK_BYTES', 3)
+    content = b'a\nbbbbbbbbbb\n\nccc\nlast'
+    path = tmp_path / 'lines.txt'
+    path.write_bytes(content)
+    starts = [0] + [index + 1 for index, byte in enumerate(content) if byte == ord('\n')]
+    with open(path, 'rb') as stream:
+        for offset in range(len(content) + 2):
+            expected = next((start for start in starts if start >= offset), len(content))
+            assert batch._next_line_start(stream, offset, len(content)) == expected
+
+
+@pytest.mark.parametrize('block_bytes', [1, 2, 3, 5, 1024])
+@pytest.mark.parametrize('document', [
+    '[-5000000000.0]',
+    '[1.5e+10, 2, 3.25, -0.0, 12345678901234567890]',
+    '["s\\"x", true, false, null, {"a": [1e-3, "\\u00e9"]}, "é"]',
+    ' [ ] ',
+])
+def test_json_array_records_across_blocks(document, block_bytes):
+    stream = io.BytesIO(document.encode('utf-8'))
+    assert list(batch.json_array_records(stream, block_bytes=block_bytes)) == json.loads(document)
+
+
+def test_json_array_malformed_element_raises_without_reading_on():
+    document = '[{"a": 1}, {"a": 1 "b": 2}, ' + ', '.join(['{"a": 1}'] * 10000) + ']'
+    stream = io.BytesIO(document.encode('utf-8'))
+    with pytest.raises(ValueError):
+        list(batch.json_array_records(stream, block_bytes=1024))
+    assert stream.tell() <= 2048
+
+
+def test_json_array_element_size_is_capped():
+    stream = io.BytesIO(('["' + 'x' * 5000 + '"]').encode('utf-8'))
+    with pytest.raises(ValueError, match='exceeds'):
+        list(batch.json_array_records(stream, block_bytes=100, max_record_chars=1000))
+
+
+def test_csv_line_numbers_across_ranges(tmp_path):
+    records = _records(60)
+    path = tmp_path / 'records.csv'
+    with open(path, 'w') as stream:
+        stream.write('id,email\n')
+        for record in records:
+            stream.write(f'{record["id"]},{record["email"]}\n')
+    expected = [position + 2 for position, record in enumerate(records) if record['id'] == 'x' or record['email'] == 'bad']
+
+    summary, report = _run(path, workers=1, chunk_bytes=40)
+    assert summary['records'] == len(records)
+    assert [entry['line'] for entry in report] == expected
+
+
+def test_ndjson_line_numbers_count_blank_lines(tmp_path):
+    path = tmp_path / 'records.ndjson'
+    path.write_text('{"id": 1, "email": "a@b.com"}\n\n{"id": "x", "email": "a@b.com"}\nnot json\n')
+    summary, report = _run(path, workers=1, chunk_bytes=8)
+    assert summary['records'] == 3
+    assert [entry['line'] for entry in report] == [3, 4]
+
+
+@pytest.mark.parametrize('format', ['ndjson', 'csv', 'json'])
+def test_workers_do_not_change_the_report(tmp_path, format):
+    records = _records(500)
+    path = tmp_path / f'records.{format}'
+    if format == 'ndjson':
+        path.write_text(''.join(json.dumps(record) + '\n' for record in records))
+    elif format == 'csv':
+        path.write_text('id,email\n' + ''.join(f'{r["id"]},{r["email"]}\n' for r in records))
+    else:
+        path.write_text(json.dumps(records))
+
+    single = _run(path, workers=1, chunk_bytes=512, batch_records=37)
+    several = _run(path, workers=3, chunk_bytes=512, batch_records=37)
+    assert single[1] == several[1]
+    assert single[0]['records'] == several[0]['records'] == len(records)
+    assert single[0]['invalid'] == several[0]['invalid'] == len(single[1]) > 0
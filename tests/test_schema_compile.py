@@ -0,0 +1,20 @@
+from flask_validators.models import Schema
+
+
+def _schemas():
+    email = {'required': True, 'validators': [{'name': 'email'}]}
+    plain = {'required': True}
+    return Schema({'a': email, 'b': plain}), Schema({'b': plain, 'a': email})
+
+
+def test_reordered_schemas_compile_separately():
+    data = [
+        {'a': 'user@example.com', 'b': 'x'},
+        {'a': 'not-an-email', 'b': ''},
+        {'a': '', 'b': 'y'},
+    ]
+    for fail_fast in (False, True, 'request'):
+        for schema in _schemas():
+            validate = schema.compile(fail_fast)
+            for record in data:
+                assert validate(record) == schema.validate(record, fail_fast)
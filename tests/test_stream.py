@@ -0,0 +1,41 @@
+import pytest
+
+from flask import Flask, jsonify
+
+from flask_validators import Field, Schema, validate_stream
+
+NDJSON = b'{"id": 1, "email": "a@b.com"}\n{"id": "x", "email": "a@b.com"}\n{"id": 2, "email": "bad"}\n'
+CSV = b'id,email\n1,a@b.com\nx,a@b.com\n2,bad\n'
+
+RULES = Schema({
+    'id': {'required': True, 'type': 'integer'},
+    'email': {'required': True, 'validators': [{'name': 'email'}]},
+})
+FIELDS = Schema({
+    'id': Field(required=True, type='integer'),
+    'email': Field(required=True, validators=[{'name': 'email'}]),
+})
+
+
+def _client(schema):
+    app = Flask(__name__)
+
+    @app.route('/import', methods=['POST'])
+    @validate_stream(schema)
+    def import_records(records):
+        return jsonify({'ids': [record['id'] for record in records]})
+
+    return app.test_client()
+
+
+@pytest.mark.parametrize('schema', [RULES, FIELDS], ids=['rules', 'fields'])
+@pytest.mark.parametrize('body, content_type', [(NDJSON, 'application/x-ndjson'), (CSV, 'text/csv')], ids=['ndjson', 'csv'])
+def test_valid_records_reach_the_view(schema, body, content_type):
+    response = _client(schema).post('/import', data=body, content_type=content_type)
+    assert response.status_code == 200
+    assert response.get_json()['ids'] in ([1], ['1'])
+
+
+def test_mixed_schema_is_rejected_when_decorating():
+    with pytest.raises(ValueError):
+        validate_stream(Schema({'a': {'required': True}, 'b': Field()}))
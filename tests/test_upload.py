@@ -0,0 +1,86 @@
+import hashlib
+import io
+
+import pytest
+
+from flask import Flask, jsonify, request
+
+from flask_validators import validate_form
+from flask_validators.controllers.upload import guard_uploads
+from flask_validators.models.files import UploadRejected
+
+JPEG = b'\xff\xd8\xff\xe0' + b'\x00' * 2048
+RULES = {
+    'photo': {'allowed_extensions': ['jpg'], 'max_size': 4096, 'hash': 'sha256', 'message': None},
+}
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+
+    @app.route('/upload', methods=['POST'])
+    def upload():
+        guard_uploads(request, RULES)
+        try:
+            files = request.files
+        except UploadRejected as error:
+            # How far the body was read when the upload was rejected.
+            read = request.environ['wsgi.input'].tell()
+            return jsonify({'error': error.message, 'read': read}), error.status_code
+        return jsonify({
+            name: {'size': len(storage.read()), 'digest': getattr(storage.stream, 'digest', None)}
+            for name, storage in files.items()
+        })
+
+    @app.route('/form', methods=['POST'])
+    @validate_form('file')
+    def form():
+        return jsonify({'success': True})
+
+    return app.test_client()
+
+
+def _post(client, url, **files):
+    data = {name: (io.BytesIO(content), filename) for name, (content, filename) in files.items()}
+    return client.post(url, data=data, content_type='multipart/form-data')
+
+
+def test_upload_over_max_size_is_cut_off(client):
+    body = JPEG + b'\x00' * 1024 * 1024
+    response = _post(client, '/upload', photo=(body, 'photo.jpg'))
+    assert response.status_code == 413
+    assert response.get_json()['error'] == 'File size is too large.'
+    # Rejected while streaming, not after the whole body was read.
+    assert response.get_json()['read'] < len(body) // 2
+
+
+def test_validate_form_rejects_large_file_with_413(client):
+    response = _post(client, '/form', file=(b'x' * (5 * 1024 * 1024 + 1), 'notes.txt'))
+    assert response.status_code == 413
+    assert response.get_json() == {'file': 'Invalid file.'}
+
+
+def test_content_that_does_not_match_the_extension_is_rejected(client):
+    response = _post(client, '/upload', photo=(b'GIF89a' + b'\x00' * 600, 'photo.jpg'))
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'File content does not match its type.'
+
+
+def test_extension_is_checked_before_the_content(client):
+    response = _post(client, '/upload', photo=(JPEG, 'photo.exe'))
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Invalid file extension.'
+
+
+def test_digest_is_computed_while_streaming(client):
+    response = _post(client, '/upload', photo=(JPEG, 'photo.jpg'))
+    assert response.status_code == 200
+    assert response.get_json()['photo'] == {'size': len(JPEG), 'digest': hashlib.sha256(JPEG).hexdigest()}
+
+
+def test_unguarded_field_is_parsed_normally(client):
+    other = b'x' * 10000
+    response = _post(client, '/upload', photo=(JPEG, 'photo.jpg'), attachment=(other, 'big.bin'))
+    assert response.status_code == 200
+    assert response.get_json()['attachment'] == {'size': len(other), 'digest': None}
@@ -0,0 +1,37 @@
+import pytest
+
+pytest.importorskip('langid')
+
+from flask_validators.models import validate_llm
+
+GEORGIAN = 'საქართველო არის ქვეყანა ევროპისა და აზიის გასაყარზე, კავკასიის რეგიონში. '
+
+
+@pytest.fixture(autouse=True)
+def default_settings():
+    yield
+    validate_llm.set_long_text()
+
+
+def test_threshold_must_cover_a_window():
+    with pytest.raises(ValueError):
+        validate_llm.set_long_text(threshold_chars=100, window_chars=2048)
+
+
+def test_short_text_is_scored_whole():
+    validate_llm.set_long_text(threshold_chars=100, window_chars=100)
+    text = GEORGIAN * 2
+    detection = validate_llm.detect_language(text)
+    assert detection.language == 'ka'
+    assert detection.bytes_scored == len(text.encode('utf8'))
+
+
+def test_windows_are_measured_in_characters():
+    validate_llm.set_long_text(threshold_chars=1000, window_chars=500, max_windows=2, confidence=0.0)
+    text = GEORGIAN * 100
+    detection = validate_llm.detect_language(text)
+    assert detection.language == 'ka'
+    # Two windows of 500 characters, each encoded to UTF-8.
+    window = text[:500].encode('utf8')
+    assert len(window) > 500
+    assert detection.bytes_scored == len(window) + len(text[(len(text) // 500 - 1) * 500:len(text) // 500 * 500].encode('utf8'))
@@ -0,0 +1,35 @@
+from flask_validators import DataValidator, Field, Schema
+
+SCHEMA = Schema({
+    'email': Field(required=True, type='string', validators=[{'name': 'email'}]),
+    'age': Field(type='integer', validators=[{'name': 'age', 'args': (0, 120)}]),
+    'password': Field(type='string'),
+    'confirm': Field(type='string', validators=[{'name': 'confirm_password', 'kwargs': {'password_field': 'password'}}]),
+    'address': Field(schema={
+        'zip': Field(required=True, type='string', validators=[{'name': 'zipcode'}]),
+        'city': Field(required=True, type='string', validators=[{'name': 'name'}]),
+    }),
+    'tags': Field(items=Field(type='string', validators=[{'name': 'hex_color'}]), max_items=3),
+})
+
+RECORDS = [
+    {'email': 'a@example.com', 'age': '30', 'address': {'zip': '12345', 'city': 'Tbilisi'}, 'tags': ['#fff']},
+    {'email': 'bad', 'age': 'x', 'password': 'secret!1', 'confirm': 'other'},
+    {'email': 'b@example.com', 'address': {'zip': 'nope', 'city': ' '}},
+    {'address': {}, 'tags': ['#fff', 'red', '#000', 'blue']},
+    {'email': 'c@example.com', 'address': 'not an object', 'tags': ['red', 'blue']},
+    {'email': 'd@example.com', 'age': '200', 'password': 'secret!1', 'confirm': 'secret!1'},
+]
+
+
+def test_validate_many_matches_validate():
+    result = DataValidator(SCHEMA, RECORDS).validate_many()
+    expected = [DataValidator(SCHEMA, record).validate() for record in RECORDS]
+    assert result['errors'] == expected
+    assert result['invalid'] == sum(1 for errors in expected if errors)
+    assert result['valid'] == len(RECORDS) - result['invalid']
+
+
+def test_nested_errors_use_json_pointers():
+    errors = DataValidator(SCHEMA, RECORDS[2:3]).validate_many()['errors'][0]
+    assert errors == {'/address/zip': 'Invalid zipcode.', '/address/city': 'Invalid name.'}